@@ -0,0 +1,98 @@
+"""
+Import-time profile of the app's modules, from `python -X importtime`.
+
+    python benchmarks/import_profile.py                 # every target, top 15 imports each
+    python benchmarks/import_profile.py utils.gemini_utils --top 30
+    python benchmarks/import_profile.py --json > import_profile.json
+
+Each target is imported in a fresh interpreter from the repository root, so the numbers
+are what a cold Streamlit worker pays before its first page. Heavy dependencies that
+should only load on first use (the Gemini SDK, PyPDF2, spaCy) are listed when a target
+pulls them in at import; the exit status is 1 if any target does, or fails to import.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What main.py and the pages import before rendering anything
+DEFAULT_TARGETS = [
+    "utils",
+    "utils.resume_utils",
+    "utils.ui_utils",
+    "utils.resume_generator",
+    "utils.local_match_utils",
+    "utils.gemini_utils",
+    "utils.skill_classifier",
+    "utils.prefetch",
+    "utils.background",
+]
+
+# Top-level packages that must not be loaded just by importing a target
+LAZY_PACKAGES = ["google.generativeai", "PyPDF2", "spacy"]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+def _importtime(code: str):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us),
+                            "depth": len(indent) // 2})
+    return result, modules
+
+def profile(target: str, baseline: set) -> dict:
+    """
+    Imports one target in a fresh interpreter and returns its total import time and
+    every module it loaded beyond interpreter startup, with self and cumulative microseconds.
+    """
+    result, modules = _importtime(f"import {target}")
+    modules = [m for m in modules if m["module"] not in baseline]
+    loaded = {m["module"] for m in modules}
+    return {
+        "target": target,
+        "ok": result.returncode == 0,
+        "error": result.stderr.strip().splitlines()[-1] if result.returncode else None,
+        # Top-level lines' cumulative times cover everything imported under them
+        "total_ms": round(sum(m["cumulative_us"] for m in modules if m["depth"] == 0) / 1000, 1),
+        "modules": len(modules),
+        "eager_heavy": [p for p in LAZY_PACKAGES if p in loaded],
+        "top": sorted(modules, key=lambda m: m["self_us"], reverse=True),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the app's modules")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list per target")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    # Modules the interpreter loads before running any code (site, encodings, .pth hooks)
+    baseline = {m["module"] for m in _importtime("pass")[1]}
+    reports = [profile(target, baseline) for target in args.targets]
+    for report in reports:
+        report["top"] = report["top"][:args.top]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            status = "ok" if report["ok"] else f"FAILED: {report['error']}"
+            print(f"\n{report['target']}: {report['total_ms']} ms, {report['modules']} modules ({status})")
+            if report["eager_heavy"]:
+                print(f"  loaded eagerly: {', '.join(report['eager_heavy'])}")
+            for m in report["top"]:
+                print(f"  {m['self_us'] / 1000:8.1f} ms self {m['cumulative_us'] / 1000:8.1f} ms cumulative  {m['module']}")
+
+    sys.exit(1 if any(report["eager_heavy"] or not report["ok"] for report in reports) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,21 @@
 import streamlit as st
 st.set_page_config(layout="wide")
-from utils import resume_utils, ui_utils, local_match_utils, resume_generator
-import PyPDF2
+from utils import resume_utils, ui_utils, local_match_utils, resume_generator, prefetch, background
 import io
 import os
 import re
+import uuid
 
 # Initialize session state for persistence
 if 'initialized' not in st.session_state:
     st.session_state['initialized'] = True
+    st.session_state['session_id'] = uuid.uuid4().hex
     st.session_state['resume_data'] = {}
     st.session_state['resume_text'] = None
     st.session_state['pdf_uploaded'] = False
     st.session_state['resume_path'] = None
     st.session_state['categorized_keywords'] = None
+    st.session_state['job_analysis'] = None
     st.session_state['job_description'] = None
     st.session_state['job_title'] = None
     st.session_state['analysis_complete'] = False
@@ -24,7 +26,9 @@ if 'initialized' not in st.session_state:
 
 def clear_analysis():
     """Clear all analysis related session state"""
+    background.cancel_precompute(st.session_state['session_id'])
     st.session_state['categorized_keywords'] = None
+    st.session_state['job_analysis'] = None
     st.session_state['job_description'] = None
     st.session_state['job_title'] = None
     st.session_state['analysis_complete'] = False
@@ -64,6 +68,8 @@ with col1:
 
         if uploaded_file is not None and not st.session_state['pdf_uploaded']:
             try:
+                # PyPDF2 is only needed for uploads, so it is not loaded on cold start
+                import PyPDF2
                 pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
                 resume_text = ""
                 for page in pdf_reader.pages:
@@ -86,6 +92,14 @@ with col2:
         job_title = st.text_input("Job Title", value=st.session_state.get('job_title', ''))
         job_description = st.text_area("Job Description", value=st.session_state.get('job_description', ''))
 
+        # Start keyword analysis as soon as the pasted description is committed, before the button is clicked
+        if job_description and not st.session_state.get('analysis_complete'):
+            prefetch.schedule_job_analysis(st.session_state['session_id'], job_description)
+
+        # Downstream precompute belongs to the analyzed description; stop it once that changes
+        if st.session_state.get('analysis_complete') and job_description != st.session_state.get('job_description'):
+            background.cancel_precompute(st.session_state['session_id'])
+
         if st.button("Analyze Resume") or st.session_state.get('analysis_complete'):
             if job_description and job_title:
                 # Update session state
@@ -95,26 +109,38 @@ with col2:
                 # Only run analysis if not already complete
                 if not st.session_state.get('analysis_complete'):
                     with st.spinner("Analyzing your resume..."):
-                        # Process with local matching using Gemini model
-                        high_priority, low_priority = local_match_utils.categorize_keywords(job_description)
+                        # One Gemini call per job description, shared by every page;
+                        # usually already finished by the prefetch. Started before the
+                        # offline preview so the request is in flight while it is computed
+                        prefetched = prefetch.is_ready(job_description)
+                        pending = prefetch.submit_job_analysis(job_description, st.session_state['session_id'])
+
+                        # Offline first answer, replaced once the Gemini analysis arrives
+                        preliminary = st.empty()
+                        if not prefetched:
+                            quick = local_match_utils.analyze_job_local(job_description)
+                            if quick.high_priority and not pending.done():
+                                preliminary.info("Preliminary keywords: " + ", ".join(quick.high_priority))
+
+                        analysis = pending.result()
+                        preliminary.empty()
+                        high_priority = list(analysis.high_priority)
+                        low_priority = list(analysis.low_priority)
                         
                         # Store in session state
-                        st.session_state['categorized_keywords'] = {"high": high_priority, "low": low_priority}
+                        st.session_state['job_analysis'] = analysis
+                        st.session_state['categorized_keywords'] = analysis.as_dict()
                         st.session_state['high_priority'] = high_priority
                         st.session_state['low_priority'] = low_priority
                         
                         # Calculate scores
-                        technical_score = local_match_utils.calculate_technical_skills_match_score(
-                            job_description, st.session_state['resume_text'])
-                        st.session_state['technical_score'] = technical_score
-                        
-                        # Count matched keywords
-                        matched_count_high = sum(1 for k in high_priority if local_match_utils.get_keyword_matches([k], st.session_state['resume_text']).get(k, False))
-                        matched_count_low = sum(1 for k in low_priority if local_match_utils.get_keyword_matches([k], st.session_state['resume_text']).get(k, False))
-                        total_count = len(high_priority) + len(low_priority)
-                        overall_score = round(((matched_count_high + matched_count_low) / total_count) * 100, 1) if total_count > 0 else 0
-                        st.session_state['overall_score'] = overall_score
+                        scores = analysis.scores(st.session_state['resume_text'])
+                        st.session_state['technical_score'] = scores['technical_score']
+                        st.session_state['overall_score'] = scores['overall_score']
                         st.session_state['analysis_complete'] = True
+                        
+                        # Warm the Skill Classification and Resume Tailor pages while results are read
+                        background.precompute_downstream_pages(st.session_state['session_id'], analysis)
                 
                 # Display results from session state
                 st.subheader("Technical Skills Match")
@@ -127,13 +153,15 @@ with col2:
                 
                 # Create columns for keyword display
                 col_high, col_low = st.columns(2)
+                analysis = st.session_state['job_analysis']
+                matches_high, matches_low = analysis.keyword_matches(st.session_state['resume_text'])
                 
                 with col_high:
                     st.subheader("High Priority Keywords")
                     matched_high = []
                     unmatched_high = []
                     for keyword in st.session_state['high_priority']:
-                        if local_match_utils.get_keyword_matches([keyword], st.session_state['resume_text']).get(keyword, False):
+                        if matches_high.get(keyword, False):
                             matched_high.append(keyword)
                         else:
                             unmatched_high.append(keyword)
@@ -150,7 +178,7 @@ with col2:
                     matched_low = []
                     unmatched_low = []
                     for keyword in st.session_state['low_priority']:
-                        if local_match_utils.get_keyword_matches([keyword], st.session_state['resume_text']).get(keyword, False):
+                        if matches_low.get(keyword, False):
                             matched_low.append(keyword)
                         else:
                             unmatched_low.append(keyword)
@@ -1,12 +1,10 @@
 import streamlit as st
 import os
-import tempfile
-import subprocess
 from pathlib import Path
-import base64
 from utils.skill_classifier import classify_skills_and_generate_projects
-from utils.local_match_utils import get_keyword_matches, calculate_technical_skills_match_score
-import shutil
+from utils.latex_compiler import compile_preview
+from utils.gemini_utils import stream_tailored_resume_section
+from utils.ui_utils import display_stream
 import re
 
 def extract_section(tex_content, section_name):
@@ -31,41 +29,11 @@ def update_section(tex_content, section_name, new_content):
     return re.sub(pattern, new_content, tex_content, flags=re.DOTALL)
 
 def render_latex_preview(tex_content: str) -> str:
-    try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_dir_path = Path(temp_dir)
-            
-            # Copy resume.cls to temp directory
-            cls_path = Path("resumes/resume.cls")
-            if cls_path.exists():
-                shutil.copy2(cls_path, temp_dir_path / "resume.cls")
-            else:
-                st.error("resume.cls not found. Please ensure it exists in the resumes directory.")
-                return None
-            
-            # Write the LaTeX content to a temporary file
-            tex_file = temp_dir_path / "resume.tex"
-            tex_file.write_text(tex_content)
-            
-            # Run pdflatex twice to resolve references
-            for _ in range(2):
-                result = subprocess.run(
-                    ['pdflatex', '-interaction=nonstopmode', 'resume.tex'],
-                    cwd=temp_dir,
-                    capture_output=True,
-                    text=True
-                )
-            
-            pdf_path = temp_dir_path / "resume.pdf"
-            if pdf_path.exists():
-                return base64.b64encode(pdf_path.read_bytes()).decode()
-            else:
-                error_msg = result.stderr if result.stderr else result.stdout
-                st.error(f"LaTeX compilation failed. Error: {error_msg}")
-                return None
-    except Exception as e:
-        st.error(f"Error generating PDF: {str(e)}")
-        return None
+    # Compiled once per content; usually already done in the background after analysis
+    pdf_base64, error = compile_preview(tex_content)
+    if error:
+        st.error(error)
+    return pdf_base64
 
 def render_resume_tailor():
     st.title("Resume Tailor")
@@ -79,27 +47,17 @@ def render_resume_tailor():
     if 'edited_content' not in st.session_state:
         st.session_state['edited_content'] = resume_path.read_text()
     
-    # Calculate and display match scores at the top
-    if 'job_description' in st.session_state and 'categorized_keywords' in st.session_state:
-        technical_score = calculate_technical_skills_match_score(
-            st.session_state['job_description'], st.session_state['edited_content'])
-        
-        high_priority = st.session_state['categorized_keywords']['high']
-        low_priority = st.session_state['categorized_keywords']['low']
-        matches_high = get_keyword_matches(high_priority, st.session_state['edited_content'])
-        matches_low = get_keyword_matches(low_priority, st.session_state['edited_content'])
-        
-        matched_count_high = sum(1 for v in matches_high.values() if v)
-        matched_count_low = sum(1 for v in matches_low.values() if v)
-        total_count = len(high_priority) + len(low_priority)
-        overall_score = round(((matched_count_high + matched_count_low) / total_count) * 100, 1) if total_count > 0 else 0
+    # Scores reuse the JobAnalysis computed on the main page, so edits never re-query Gemini
+    analysis = st.session_state.get('job_analysis')
+    if analysis is not None:
+        scores = analysis.scores(st.session_state['edited_content'])
         
         # Display scores at the top with metrics
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Technical Skills Match", f"{technical_score}%")
+            st.metric("Technical Skills Match", f"{scores['technical_score']}%")
         with col2:
-            st.metric("Overall Match Score", f"{overall_score}%")
+            st.metric("Overall Match Score", f"{scores['overall_score']}%")
     
     # Create columns for the layout
     col1, col2 = st.columns([3, 2])
@@ -132,12 +90,9 @@ def render_resume_tailor():
                 }
                 
                 # Only add skills from high and low priority keywords
-                if 'categorized_keywords' in st.session_state:
+                if analysis is not None:
                     # Filter out soft skills when adding to all_skills
-                    for skill in st.session_state['categorized_keywords']['high']:
-                        if skill.lower() not in {s.lower() for s in soft_skills}:
-                            all_skills.add(skill)
-                    for skill in st.session_state['categorized_keywords']['low']:
+                    for skill in analysis.keywords:
                         if skill.lower() not in {s.lower() for s in soft_skills}:
                             all_skills.add(skill)
                 else:
@@ -221,6 +176,37 @@ def render_resume_tailor():
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error updating resume: {str(e)}")
+        
+        # Rewrite a section for the analyzed job, shown as Gemini writes it
+        job_description = st.session_state.get('job_description')
+        if job_description:
+            st.subheader("Tailor a Section")
+            section_name = st.selectbox("Section to tailor", ["SKILLS", "PROJECTS"])
+            instructions = st.text_input("Instructions", "rewrite it to highlight the skills this job asks for")
+            tailored_placeholder = st.empty()
+            if st.button("Tailor Section"):
+                section = extract_section(st.session_state['edited_content'], section_name)
+                section_content = section.replace(f'\\begin{{rSection}}{{{section_name}}}\n', '').replace('\n\\end{rSection}', '')
+                try:
+                    tailored = display_stream(
+                        stream_tailored_resume_section(job_description, section_content, instructions),
+                        tailored_placeholder, language="latex")
+                    # Drop a markdown fence around the LaTeX, if the model added one
+                    tailored = re.sub(r'^```\w*\n|\n?```$', '', tailored.strip()).strip()
+                    st.session_state['tailored_section'] = (section_name, tailored)
+                except Exception as e:
+                    st.error(f"Error tailoring section: {str(e)}")
+            
+            tailored_section = st.session_state.get('tailored_section')
+            if tailored_section and tailored_section[0] == section_name:
+                tailored_placeholder.code(tailored_section[1], language="latex")
+                if st.button("Apply Tailored Section"):
+                    new_content = update_section(st.session_state['edited_content'], section_name, tailored_section[1])
+                    resume_path.write_text(new_content)
+                    st.session_state['edited_content'] = new_content
+                    st.session_state['should_render'] = True
+                    del st.session_state['tailored_section']
+                    st.rerun()
     
     with col2:
         st.subheader("PDF Preview")
@@ -236,17 +222,17 @@ def render_resume_tailor():
             st.session_state['should_render'] = False
         
         # Display keyword matches
-        if 'categorized_keywords' in st.session_state:
+        if analysis is not None:
+            matches_high, matches_low = analysis.keyword_matches(st.session_state['edited_content'])
+            
             # Create columns for high and low priority keywords
             col_high, col_low = st.columns(2)
             
             with col_high:
                 st.subheader("High Priority Keywords")
-                high_priority = st.session_state['categorized_keywords']['high']
-                matches_high = get_keyword_matches(high_priority, st.session_state['edited_content'])
                 matched_high = []
                 unmatched_high = []
-                for keyword in high_priority:
+                for keyword in analysis.high_priority:
                     if matches_high.get(keyword, False):
                         matched_high.append(keyword)
                     else:
@@ -261,11 +247,9 @@ def render_resume_tailor():
             
             with col_low:
                 st.subheader("Low Priority Keywords")
-                low_priority = st.session_state['categorized_keywords']['low']
-                matches_low = get_keyword_matches(low_priority, st.session_state['edited_content'])
                 matched_low = []
                 unmatched_low = []
-                for keyword in low_priority:
+                for keyword in analysis.low_priority:
                     if matches_low.get(keyword, False):
                         matched_low.append(keyword)
                     else:
@@ -1,85 +1,36 @@
 import streamlit as st
-import google.generativeai as genai
 from typing import Dict, List, Tuple
-import os
 from pathlib import Path
-
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-model = genai.GenerativeModel('gemini-pro')
+from utils.skill_classifier import lookup_skill_classifications, group_skill_classifications
+from utils.skill_table import skill_table
 
 def classify_skills(keywords: List[str]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
     """
     Classify keywords into technical and soft skills using Gemini API
     Returns two dictionaries: high priority and low priority, each containing technical and soft skills
+    Keywords already in the persistent skill table are not sent to Gemini again;
+    only new ones go out, in one request.
     """
-    prompt = f"""
-    Classify the following keywords into technical skills and soft skills. 
-    For each category, also indicate if they are high priority (essential/core skills) or low priority (nice-to-have skills).
-    Keywords: {', '.join(keywords)}
-    
-    Please format your response exactly as follows:
-    HIGH PRIORITY:
-    Technical Skills:
-    - [list technical skills]
-    Soft Skills:
-    - [list soft skills]
-    
-    LOW PRIORITY:
-    Technical Skills:
-    - [list technical skills]
-    Soft Skills:
-    - [list soft skills]
-    """
-    
     try:
-        response = model.generate_content(prompt)
-        text = response.text
-        
-        # Parse the response
-        high_priority = {"technical": [], "soft": []}
-        low_priority = {"technical": [], "soft": []}
-        
-        current_section = None
-        current_category = None
-        
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            if "HIGH PRIORITY:" in line:
-                current_section = "high"
-            elif "LOW PRIORITY:" in line:
-                current_section = "low"
-            elif "Technical Skills:" in line:
-                current_category = "technical"
-            elif "Soft Skills:" in line:
-                current_category = "soft"
-            elif line.startswith('-') and current_section and current_category:
-                skill = line.replace('-', '').strip()
-                if current_section == "high":
-                    high_priority[current_category].append(skill)
-                else:
-                    low_priority[current_category].append(skill)
-        
-        return high_priority, low_priority
-        
+        known = lookup_skill_classifications(keywords)
     except Exception as e:
         st.error(f"Error classifying skills: {str(e)}")
-        return {"technical": [], "soft": []}, {"technical": [], "soft": []}
+        known = skill_table.lookup(keywords)
+    
+    return group_skill_classifications(keywords, known)
 
 def render_skill_classification():
     st.title("Skill Classification")
     
-    if 'categorized_keywords' not in st.session_state:
+    analysis = st.session_state.get('job_analysis')
+    if analysis is None:
         st.warning("Please analyze a job description first to get keywords")
         return
         
     # Get all keywords
-    high_priority = st.session_state['categorized_keywords']['high']
-    low_priority = st.session_state['categorized_keywords']['low']
-    all_keywords = high_priority + low_priority
+    high_priority = list(analysis.high_priority)
+    low_priority = list(analysis.low_priority)
+    all_keywords = analysis.keywords
     
     # Classify skills
     high_priority_skills, low_priority_skills = classify_skills(all_keywords)
@@ -0,0 +1,53 @@
+"""
+Texts and keywords shared by the keyword matcher and resume index tests.
+"""
+import random
+from pathlib import Path
+
+from utils import local_match_utils
+from utils.keyword_matcher import WORD_RUN
+from utils.local_keywords import TECH_SKILLS, SOFT_SKILLS
+from utils.resume_index import MAX_NGRAM, MAX_SYMBOLS
+
+ROOT = Path(__file__).resolve().parents[1]
+
+RESUME_TEXT = (ROOT / "resumes" / "resume.tex").read_text(encoding="utf-8")
+
+SYMBOL_TEXT = (
+    "Skills: C++, C#, .NET, ASP.NET Core, Node.js, Vue.js; CI/CD (GitHub Actions) & Docker. "
+    "Built c++++ bindings, F# scripts and a --verbose CLI; 10+ years of Java (not JavaScript). "
+    "Machine  learning,\tdeep-learning and ML-Ops; R&D on TCP/IP... Objective-C++ #hashtags "
+    "email@example.com ++x x++ (C) [Go] {Rust} naïve café résumé _private_ snake_case"
+)
+
+TEXTS = [RESUME_TEXT, SYMBOL_TEXT, local_match_utils.prompt]
+
+EDGE_KEYWORDS = [
+    "C++", "C#", ".NET", "ASP.NET", "ASP.NET Core", "Node.js", "CI/CD", "F#", "c++++", "++",
+    "--verbose", "10+", "10+ years", "Java", "JavaScript", "machine learning", "machine  learning",
+    "deep-learning", "ML-Ops", "R&D", "TCP/IP", "TCP/IP...", "Objective-C++", "#hashtags",
+    "email@example.com", "x++", "++x", "(C)", "[Go]", "Rust", "{Rust}", "naïve", "résumé",
+    "_private_", "snake_case", "private", "case", " Docker ", "", "   ", "#", "...",
+    "GitHub Actions) & Docker", "built c++++ bindings, f# scripts and a",
+]
+
+TEXT_IDS = ["resume", "symbols", "prompt"]
+
+def sampled_keywords(text: str, count: int = 400, seed: int = 0):
+    """
+    Substrings of the text that start and end on word runs, of 1 to MAX_NGRAM + 2 runs,
+    with up to MAX_SYMBOLS + 1 neighbouring characters added on either side.
+    """
+    rng = random.Random(seed)
+    runs = [(m.start(), m.end()) for m in WORD_RUN.finditer(text)]
+    keywords = []
+    for _ in range(count):
+        i = rng.randrange(len(runs))
+        j = min(len(runs) - 1, i + rng.randrange(MAX_NGRAM + 2))
+        start = max(0, runs[i][0] - rng.randrange(MAX_SYMBOLS + 2))
+        end = runs[j][1] + rng.randrange(MAX_SYMBOLS + 2)
+        keywords.append(text[start:end])
+    return keywords
+
+def keywords_for(text: str):
+    return TECH_SKILLS + SOFT_SKILLS + EDGE_KEYWORDS + sampled_keywords(text)
@@ -0,0 +1,26 @@
+import re
+
+import pytest
+
+from utils import local_match_utils
+from utils.jd_cleaner import strip_boilerplate
+from utils.keyword_matcher import get_matcher
+
+_EXAMPLE = re.compile(r"input: (.*?)\noutput: High Priority Keywords?: (.*?)\nLow Priority Keywords?: (.*?)\n", re.S)
+EXAMPLES = _EXAMPLE.findall(local_match_utils.prompt)
+
+def test_all_prompt_examples_found():
+    assert len(EXAMPLES) == 5
+
+@pytest.mark.parametrize("job_description,high,low", EXAMPLES,
+                         ids=[f"example{i}" for i in range(1, len(EXAMPLES) + 1)])
+def test_expected_keywords_survive_stripping(job_description, high, low):
+    keywords = [k.strip(" .") for k in f"{high},{low}".split(",") if k.strip(" .")]
+    matcher = get_matcher(keywords)
+    cleaned = strip_boilerplate(job_description)
+    assert matcher.found(job_description) - matcher.found(cleaned.text) == set()
+
+def test_boilerplate_is_still_stripped():
+    # The WorkSaga example is mostly application instructions
+    job_description = EXAMPLES[-1][0]
+    assert len(strip_boilerplate(job_description).text) < 0.6 * len(job_description)
@@ -0,0 +1,29 @@
+import re
+
+import pytest
+
+from keyword_corpus import SYMBOL_TEXT, TEXTS, TEXT_IDS, keywords_for
+from utils.keyword_matcher import WORD_RUN, KeywordMatcher, get_matcher
+
+def _regex_found(keyword: str, text: str) -> bool:
+    # The per-keyword scan KeywordMatcher replaced
+    return bool(re.search(r"\b" + re.escape(keyword.lower()) + r"\b", text.lower()))
+
+def _word_edged(keyword: str) -> bool:
+    key = keyword.lower().strip()
+    return bool(key) and WORD_RUN.fullmatch(key[0]) is not None and WORD_RUN.fullmatch(key[-1]) is not None
+
+@pytest.mark.parametrize("text", TEXTS, ids=TEXT_IDS)
+def test_matcher_agrees_with_per_keyword_regex(text):
+    # Same results as the old \b...\b scans wherever both keyword edges are word characters;
+    # at symbol edges ("C++") the matcher needs no boundary, which the regex got wrong
+    keywords = [k for k in keywords_for(text) if _word_edged(k) and k == k.strip()]
+    found = KeywordMatcher(keywords).found(text)
+    for keyword in keywords:
+        assert (keyword.lower() in found) == _regex_found(keyword, text), keyword
+
+def test_symbol_edges():
+    found = get_matcher(["C++", "C#", ".NET", "Java", "JavaScript", "Go", "F#"]).found(SYMBOL_TEXT)
+    assert found == {"c++", "c#", ".net", "java", "javascript", "go", "f#"}
+    assert get_matcher(["Java"]).found("JavaScript only") == set()
+    assert get_matcher(["C++"]).found("Objective-C++ and C++11") == {"c++"}
@@ -0,0 +1,14 @@
+import pytest
+
+from keyword_corpus import TEXTS, TEXT_IDS, keywords_for
+from utils.keyword_matcher import KeywordMatcher, get_matcher
+from utils.resume_index import ResumeIndex
+
+@pytest.mark.parametrize("text", TEXTS, ids=TEXT_IDS)
+def test_index_agrees_with_matcher(text):
+    index = ResumeIndex.build(text)
+    keywords = keywords_for(text)
+    for keyword in keywords:
+        expected = bool(KeywordMatcher([keyword]).found(text)) if keyword.strip() else False
+        assert index.contains(keyword) == expected, repr(keyword)
+    assert index.found(keywords) == get_matcher(keywords).found(text)
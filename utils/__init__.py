@@ -1,4 +1,33 @@
-from .resume_generator import generate_latex_resume, generate_projects
-from .resume_utils import *
-from .ui_utils import *
-from .local_match_utils import *
+import importlib
+
+from dotenv import load_dotenv
+
+# Load .env before any module reads its settings from the environment
+load_dotenv()
+
+# Names re-exported from submodules. They are imported on first access, so `import utils`
+# (and every `from utils import <module>`) loads only what the caller uses
+_EXPORTS = {
+    "resume_generator": ["generate_latex_resume", "generate_projects"],
+    "resume_utils": ["RESUME_DIR", "load_resume", "save_resume", "parse_resume", "format_resume_latex",
+                     "integrate_tailored_section", "list_resumes", "save_uploaded_resume"],
+    "ui_utils": ["display_keywords", "display_match_score", "display_resume_preview",
+                 "get_editable_resume_layout", "get_side_by_side_layout", "display_stream"],
+    "local_match_utils": ["generation_config", "MODEL_NAME", "KEYWORD_EXTRACTOR", "prompt", "compact_prompt",
+                          "PROMPT_MODE", "token_accounting", "get_token_savings", "categorize_keywords",
+                          "split_job_description", "merge_keyword_results", "categorize_keywords_batch",
+                          "calculate_keyword_match_score", "calculate_technical_skills_match_score",
+                          "get_keyword_matches", "JobAnalysis", "analyze_job", "analyze_job_local"],
+}
+_EXPORT_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+def __getattr__(name):
+    module = _EXPORT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORT_MODULES))
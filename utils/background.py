@@ -0,0 +1,110 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict
+
+from .latex_compiler import compile_preview
+from .rate_limiter import Priority
+from .skill_classifier import lookup_skill_classifications
+
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 4))
+
+class TaskGroups:
+    """
+    Runs named groups of background tasks on a shared thread pool.
+    Starting a group under a key that already has one cancels the older group: its queued
+    tasks never run, and running tasks can poll their cancel event between steps.
+    """
+
+    def __init__(self, max_workers: int = BACKGROUND_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self._lock = threading.Lock()
+        self._groups: Dict[str, tuple] = {}
+
+    def start(self, key: str, tasks: Dict[str, Callable[[threading.Event], object]]) -> threading.Event:
+        """
+        Cancels any group running under `key` and submits `tasks`, each called with the
+        group's cancel event. Returns that event.
+        """
+        cancelled = threading.Event()
+        with self._lock:
+            self._cancel_locked(key)
+            futures = {name: self._executor.submit(self._run, name, task, cancelled)
+                       for name, task in tasks.items()}
+            self._groups[key] = (cancelled, futures)
+        return cancelled
+
+    @staticmethod
+    def _run(name: str, task: Callable[[threading.Event], object], cancelled: threading.Event):
+        if cancelled.is_set():
+            return None
+        try:
+            return task(cancelled)
+        except Exception as e:
+            print(f"Background task '{name}' failed: {e}")
+            raise
+
+    def _cancel_locked(self, key: str) -> None:
+        group = self._groups.pop(key, None)
+        if group is not None:
+            cancelled, futures = group
+            cancelled.set()
+            for future in futures.values():
+                future.cancel()
+
+    def cancel(self, key: str) -> None:
+        """
+        Cancels the group running under `key`, if any.
+        """
+        with self._lock:
+            self._cancel_locked(key)
+
+    def status(self, key: str) -> Dict[str, str]:
+        """
+        Returns {task name: "pending" | "running" | "done" | "failed" | "cancelled"} for a group.
+        """
+        with self._lock:
+            group = self._groups.get(key)
+        if group is None:
+            return {}
+        return {name: _future_state(future) for name, future in group[1].items()}
+
+def _future_state(future: Future) -> str:
+    if future.cancelled():
+        return "cancelled"
+    if future.running():
+        return "running"
+    if not future.done():
+        return "pending"
+    return "failed" if future.exception() is not None else "done"
+
+# Process-wide task groups, keyed by session id
+task_groups = TaskGroups()
+
+def precompute_downstream_pages(session_id: str, analysis, resume_tex_path: str = "resumes/resume.tex") -> None:
+    """
+    Warms what the Skill Classification and Resume Tailor pages need right after an
+    analysis: the skill table entries for its keywords and the first tailor preview
+    compile. Replaces any precompute the session already had running, e.g. for a
+    previous job description.
+    """
+    def classify(cancelled: threading.Event):
+        return lookup_skill_classifications(analysis.keywords, Priority.BACKGROUND)
+
+    def preview(cancelled: threading.Event):
+        tex_path = Path(resume_tex_path)
+        if tex_path.exists() and not cancelled.is_set():
+            return compile_preview(tex_path.read_text())
+        return None
+
+    task_groups.start(session_id, {
+        "skill_classification": classify,
+        "tailor_preview": preview,
+    })
+
+def cancel_precompute(session_id: str) -> None:
+    """
+    Stops the session's pending precompute work, e.g. when its job description changes.
+    """
+    task_groups.cancel(session_id)
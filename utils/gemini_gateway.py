@@ -0,0 +1,352 @@
+import os
+import time
+import queue
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional
+from .llm_cache import make_cache_key
+from .llm_ledger import call_ledger, estimate_tokens
+from .rate_limiter import Priority, rate_limiter
+
+# Upper bound on Gemini requests in flight across the whole process
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+
+# Retries after the API reports an exhausted quota (HTTP 429), with exponential backoff
+QUOTA_RETRIES = int(os.getenv("GEMINI_QUOTA_RETRIES", 3))
+QUOTA_BACKOFF_SECONDS = float(os.getenv("GEMINI_QUOTA_BACKOFF", 2.0))
+
+# Seconds a call may take end to end (queueing and retries included) before it is cancelled.
+# GEMINI_DEADLINES overrides single call sites: "local_match_utils.categorize_keywords=20,..."
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE", 60))
+CALL_SITE_DEADLINES: Dict[str, float] = {
+    site.strip(): float(seconds)
+    for site, _, seconds in (item.partition("=") for item in os.getenv("GEMINI_DEADLINES", "").split(","))
+    if site.strip() and seconds.strip()
+}
+
+# Interactive calls still unanswered at their call site's observed p95 latency get a
+# duplicate request; whichever answers first wins and the other is cancelled
+HEDGE_ENABLED = os.getenv("GEMINI_HEDGE", "1") != "0"
+HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", 95))
+HEDGE_MIN_SAMPLES = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", 20))
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_loop_lock = threading.Lock()
+
+# Identical requests currently in flight, shared by every caller that asks for them
+_inflight: Dict[str, asyncio.Task] = {}
+_flight_stats = {"leaders": 0, "coalesced": 0}
+_hedge_stats = {"hedged": 0, "hedge_won": 0, "deadline_exceeded": 0}
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a Gemini call does not finish within its call site's deadline.
+    """
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the gateway's event loop, starting it on a daemon thread on first use.
+    Streamlit runs each script in its own thread, so all sessions share this loop.
+    """
+    global _loop, _semaphore
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="gemini-gateway", daemon=True)
+            thread.start()
+            _semaphore = asyncio.run_coroutine_threadsafe(_make_semaphore(), loop).result()
+            _loop = loop
+    return _loop
+
+async def _make_semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(MAX_CONCURRENCY)
+
+def _model_name(model) -> str:
+    return getattr(model, "model_name", None) or type(model).__name__
+
+def _response_text(response) -> str:
+    try:
+        return response.text
+    except Exception:
+        return ""
+
+def _is_quota_error(error: Exception) -> bool:
+    return type(error).__name__ in ("ResourceExhausted", "TooManyRequests") or "429" in str(error)
+
+def _flight_key(model, prompt, kwargs: Dict[str, Any]) -> str:
+    config = {
+        "generation_config": repr(getattr(model, "_generation_config", None)),
+        "kwargs": repr(sorted(kwargs.items())),
+    }
+    return make_cache_key(_model_name(model), config, prompt if isinstance(prompt, str) else repr(prompt))
+
+def deadline_for(call_site: str) -> float:
+    """
+    Returns the deadline in seconds for a call site.
+    """
+    return CALL_SITE_DEADLINES.get(call_site, DEFAULT_DEADLINE_SECONDS)
+
+def set_deadline(call_site: str, seconds: float) -> None:
+    """
+    Sets the deadline for one call site, overriding GEMINI_DEADLINE / GEMINI_DEADLINES.
+    """
+    CALL_SITE_DEADLINES[call_site] = seconds
+
+def _hedge_delay(call_site: str) -> Optional[float]:
+    """
+    Seconds after which a duplicate request is sent, or None while the call site has too
+    few latency samples for a meaningful percentile.
+    """
+    if not HEDGE_ENABLED or call_ledger.sample_count(call_site) < HEDGE_MIN_SAMPLES:
+        return None
+    return call_ledger.latency_percentile(call_site, HEDGE_PERCENTILE) / 1000
+
+def _forget_flight(key: str, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark the outcome as seen even if every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
+async def generate_async(model, prompt, call_site: str = "unknown",
+                         priority: Priority = Priority.INTERACTIVE, coalesce: bool = True,
+                         deadline: Optional[float] = None, **kwargs) -> Any:
+    """
+    Sends one generate_content request once the rate limiter admits it at `priority`
+    and a concurrency slot is free. Quota errors are retried with backoff instead of
+    surfacing to the caller. Every attempt is recorded in the call ledger under `call_site`.
+
+    The call is cancelled with DeadlineExceeded after `deadline` seconds (default: the call
+    site's, see deadline_for). Interactive calls are hedged: once the call site's observed
+    p95 latency passes without an answer, a duplicate is sent and the slower one cancelled.
+
+    With `coalesce` (the default), a request identical to one already in flight (same
+    model, generation config, prompt and arguments) waits for that call's response instead
+    of sending a duplicate. Cancelling one waiter does not cancel the shared call.
+    Must be awaited on the gateway loop (use `run`, `generate` or `gather`).
+    """
+    deadline = deadline_for(call_site) if deadline is None else deadline
+    if not coalesce:
+        return await _send_within_deadline(model, prompt, call_site, priority, deadline, **kwargs)
+
+    key = _flight_key(model, prompt, kwargs)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_send_within_deadline(model, prompt, call_site, priority, deadline, **kwargs))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _forget_flight(key, done))
+        _flight_stats["leaders"] += 1
+    else:
+        _flight_stats["coalesced"] += 1
+    return await asyncio.shield(task)
+
+async def _send_within_deadline(model, prompt, call_site: str, priority: Priority,
+                                deadline: float, **kwargs) -> Any:
+    try:
+        return await asyncio.wait_for(_send_hedged(model, prompt, call_site, priority, **kwargs), deadline)
+    except asyncio.TimeoutError:
+        _hedge_stats["deadline_exceeded"] += 1
+        raise DeadlineExceeded(f"Gemini call at {call_site} exceeded its {deadline:g}s deadline") from None
+
+async def _send_hedged(model, prompt, call_site: str, priority: Priority, **kwargs) -> Any:
+    """
+    Sends the request and, for interactive calls still pending once they have been sent
+    for the hedge delay, a duplicate. Returns the first successful response and cancels
+    the other request. Time spent queued in the rate limiter does not count towards the
+    delay: the ledger percentile excludes it, and a duplicate would only join the queue.
+    """
+    delay = _hedge_delay(call_site) if priority == Priority.INTERACTIVE else None
+    if delay is None:
+        return await _send(model, prompt, call_site, priority, **kwargs)
+
+    admitted = asyncio.Event()
+    primary = asyncio.ensure_future(_send(model, prompt, call_site, priority, admitted=admitted, **kwargs))
+    pending = {primary}
+    try:
+        while True:
+            # Wait for the primary to leave the queue, then give it the delay to answer;
+            # a quota retry puts it back in the queue and restarts the wait
+            admission = asyncio.ensure_future(admitted.wait())
+            done, _ = await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            admission.cancel()
+            if primary in done:
+                return primary.result()
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            if admitted.is_set():
+                break
+        _hedge_stats["hedged"] += 1
+        pending.add(asyncio.ensure_future(_send(model, prompt, call_site, priority, hedge=True, **kwargs)))
+        while True:
+            # Stop at the first success; an error only counts once nothing else is running
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        _hedge_stats["hedge_won"] += 1
+                    return task.result()
+            if not pending:
+                return next(iter(done)).result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def _send(model, prompt, call_site: str, priority: Priority, hedge: bool = False,
+                admitted: Optional[asyncio.Event] = None, **kwargs) -> Any:
+    """
+    Sends one request through the rate limiter and concurrency cap, retrying quota errors.
+    `hedge` marks the ledger entries of a duplicate sent by _send_hedged. `admitted` is
+    set while the request is actually being sent, and cleared while it waits in a queue.
+    """
+    extra = {"hedge": True} if hedge else {}
+    cost = estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+    for attempt in range(QUOTA_RETRIES + 1):
+        if admitted is not None:
+            admitted.clear()
+        queue_wait = await rate_limiter.acquire(priority, cost)
+        async with _semaphore:
+            if admitted is not None:
+                admitted.set()
+            start = time.perf_counter()
+            try:
+                response = await model.generate_content_async(prompt, **kwargs)
+            except asyncio.CancelledError:
+                call_ledger.record(call_site, _model_name(model), prompt, None,
+                                   (time.perf_counter() - start) * 1000, "cancelled",
+                                   queue_wait_ms=round(queue_wait * 1000, 1), **extra)
+                raise
+            except Exception as e:
+                quota_error = _is_quota_error(e)
+                call_ledger.record(call_site, _model_name(model), prompt, None,
+                                   (time.perf_counter() - start) * 1000,
+                                   "quota" if quota_error else "error", error=str(e),
+                                   queue_wait_ms=round(queue_wait * 1000, 1), **extra)
+                if quota_error and attempt < QUOTA_RETRIES:
+                    rate_limiter.penalize(QUOTA_BACKOFF_SECONDS * 2 ** attempt)
+                    continue
+                raise
+        call_ledger.record(call_site, _model_name(model), prompt, _response_text(response),
+                           (time.perf_counter() - start) * 1000, "ok",
+                           usage=getattr(response, "usage_metadata", None),
+                           queue_wait_ms=round(queue_wait * 1000, 1), **extra)
+        return response
+
+async def stream_async(model, prompt, call_site: str = "unknown",
+                       priority: Priority = Priority.INTERACTIVE, **kwargs) -> AsyncIterator[str]:
+    """
+    Streams the text of one generate_content request chunk by chunk.
+    The concurrency slot is held until the stream is exhausted or closed.
+    The ledger entry also records the time to the first chunk.
+    """
+    await rate_limiter.acquire(priority, estimate_tokens(prompt if isinstance(prompt, str) else str(prompt)))
+    async with _semaphore:
+        start = time.perf_counter()
+        first_chunk_ms = None
+        text = ""
+        outcome, error = "ok", None
+        response = None
+        try:
+            response = await model.generate_content_async(prompt, stream=True, **kwargs)
+            async for chunk in response:
+                if chunk.text:
+                    if first_chunk_ms is None:
+                        first_chunk_ms = round((time.perf_counter() - start) * 1000, 1)
+                    text += chunk.text
+                    yield chunk.text
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome, error = "error", str(e)
+            raise
+        finally:
+            call_ledger.record(call_site, _model_name(model), prompt, text,
+                               (time.perf_counter() - start) * 1000, outcome, error=error,
+                               usage=getattr(response, "usage_metadata", None),
+                               first_chunk_ms=first_chunk_ms, streamed=True)
+
+_STREAM_DONE = object()
+
+def stream(model, prompt, call_site: str = "unknown",
+           priority: Priority = Priority.INTERACTIVE, deadline: Optional[float] = None,
+           **kwargs) -> Iterator[str]:
+    """
+    Synchronous wrapper around `stream_async`: yields text chunks to the calling
+    thread as soon as the gateway loop receives them.
+    Raises DeadlineExceeded if no chunk arrives for `deadline` seconds (default: the
+    call site's), so a stalled stream cannot hold the script thread indefinitely.
+    """
+    deadline = deadline_for(call_site) if deadline is None else deadline
+    chunks: queue.Queue = queue.Queue()
+
+    async def _pump():
+        try:
+            async for text in stream_async(model, prompt, call_site=call_site, priority=priority, **kwargs):
+                chunks.put(text)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_STREAM_DONE)
+
+    future = asyncio.run_coroutine_threadsafe(_pump(), _get_loop())
+    try:
+        while True:
+            try:
+                item = chunks.get(timeout=deadline)
+            except queue.Empty:
+                _hedge_stats["deadline_exceeded"] += 1
+                raise DeadlineExceeded(f"Gemini stream at {call_site} stalled for {deadline:g}s") from None
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Stop the request if the consumer stops reading early
+        future.cancel()
+
+def run(coro: Awaitable) -> Any:
+    """
+    Runs a coroutine on the gateway loop and blocks the calling thread until it finishes.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+def generate(model, prompt, call_site: str = "unknown",
+             priority: Priority = Priority.INTERACTIVE, **kwargs) -> Any:
+    """
+    Synchronous wrapper around `generate_async` for Streamlit callers.
+    """
+    return run(generate_async(model, prompt, call_site=call_site, priority=priority, **kwargs))
+
+def coalescing_stats() -> Dict[str, int]:
+    """
+    Returns how many requests were sent and how many joined an identical in-flight request.
+    """
+    return dict(_flight_stats, in_flight=len(_inflight))
+
+def hedging_stats() -> Dict[str, int]:
+    """
+    Returns how many calls were hedged, how many hedges answered first, and how many
+    calls or streams ran past their deadline.
+    """
+    return dict(_hedge_stats)
+
+def queue_stats() -> dict:
+    """
+    Returns the rate limiter's queue depth and wait times per priority class.
+    """
+    return rate_limiter.stats()
+
+def gather(*requests: Awaitable, return_exceptions: bool = False) -> List[Any]:
+    """
+    Runs independent gateway coroutines concurrently and returns their results in order,
+    so the total wait is roughly that of the slowest request.
+
+    Example:
+        overall, technical = gather(generate_async(model, p1), generate_async(model, p2))
+    """
+    async def _gather():
+        return await asyncio.gather(*requests, return_exceptions=return_exceptions)
+    return run(_gather())
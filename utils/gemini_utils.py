@@ -1,28 +1,72 @@
-import os
-import json
-from typing import List, Dict
-from dotenv import load_dotenv
-import google.generativeai as genai
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Iterator, Tuple
+from . import model_router
+from .json_repair import repair_json
+from .jd_cleaner import clean_job_description
 
-# Load environment variables
-load_dotenv()
+PRIORITIZED_KEYWORDS_PROMPT = """Extract the important keywords from the following job description and rate each as 'high' or 'low' importance.
+Return ONLY a JSON object of the form {{"high": ["keyword", ...], "low": ["keyword", ...]}}.
+Job Description: {job_description}"""
 
-# Placeholder for Gemini API key
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+MATCH_ANALYSIS_PROMPT = """Compare this job description with this resume.
+Return ONLY a JSON object of the form:
+{{"overall_score": <0-100>, "technical_score": <0-100>,
+  "keywords": [{{"keyword": "...", "priority": "high" or "low", "found": true or false, "evidence": "short resume quote or empty"}}]}}
+overall_score is the overall match percentage; technical_score considers only technical skills, tools, and technologies.
+Job Description: {job_description}
+Resume: {resume_text}"""
 
-if not GEMINI_API_KEY:
-    raise ValueError("Gemini API key not found. Please set the GEMINI_API_KEY environment variable.")
+# Shapes the replies above must have after local JSON repair
+KEYWORDS_SCHEMA = {"high": list, "low": list}
+MATCH_ANALYSIS_SCHEMA = {"overall_score": (int, float, str), "technical_score": (int, float, str)}
 
-# Initialize the Gemini model
-try:
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-pro')
-except Exception as e:
-    raise Exception(f"Failed to initialize Gemini model: {str(e)}")
+# Keyword lists returned by extract_keywords, mapped to their priorities, so that
+# categorize_keywords on the same list needs no second round trip; as many as the
+# lru_cache below holds, oldest dropped first
+_PRIORITIZED_MEMO_SIZE = 64
+_prioritized_lock = threading.Lock()
+_prioritized_by_keywords: "OrderedDict[tuple, Dict[str, List[str]]]" = OrderedDict()
+
+@lru_cache(maxsize=_PRIORITIZED_MEMO_SIZE)
+def _prioritized_keywords(job_description: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    prompt = PRIORITIZED_KEYWORDS_PROMPT.format(job_description=clean_job_description(job_description))
+    response = model_router.generate(prompt, call_site="gemini_utils.extract_prioritized_keywords",
+                                     validate=model_router.json_validator(KEYWORDS_SCHEMA))
+    result = repair_json(response.text, KEYWORDS_SCHEMA)
+    high = tuple(str(k).strip() for k in result.get("high", []) if str(k).strip())
+    low = tuple(str(k).strip() for k in result.get("low", []) if str(k).strip())
+    with _prioritized_lock:
+        _prioritized_by_keywords[high + low] = {"high": list(high), "low": list(low)}
+        _prioritized_by_keywords.move_to_end(high + low)
+        while len(_prioritized_by_keywords) > _PRIORITIZED_MEMO_SIZE:
+            _prioritized_by_keywords.popitem(last=False)
+    return high, low
+
+def extract_prioritized_keywords(job_description: str) -> Dict[str, List[str]]:
+    """
+    Extracts keywords with their importance from the job description in a single Gemini call.
+    
+    Args:
+        job_description (str): The job description text
+        
+    Returns:
+        Dict[str, List[str]]: Dictionary with 'high' and 'low' importance keywords
+        
+    Raises:
+        Exception: If Gemini API call fails or returns no usable JSON
+    """
+    try:
+        high, low = _prioritized_keywords(job_description)
+        return {"high": list(high), "low": list(low)}
+    except Exception as e:
+        raise Exception(f"Failed to extract keywords: {str(e)}")
 
 def extract_keywords(job_description: str) -> List[str]:
     """
     Extracts keywords from the job description using Gemini.
+    View over extract_prioritized_keywords; the priorities are kept for categorize_keywords.
     
     Args:
         job_description (str): The job description text
@@ -33,16 +77,13 @@ def extract_keywords(job_description: str) -> List[str]:
     Raises:
         Exception: If Gemini API call fails
     """
-    try:
-        prompt = f"Extract important keywords from the following job description. Return only the keywords separated by commas: {job_description}"
-        response = gemini_model.generate_content(prompt)
-        return [keyword.strip() for keyword in response.text.split(",")]
-    except Exception as e:
-        raise Exception(f"Failed to extract keywords: {str(e)}")
+    prioritized = extract_prioritized_keywords(job_description)
+    return prioritized["high"] + prioritized["low"]
 
 def categorize_keywords(keywords: List[str]) -> Dict[str, List[str]]:
     """
     Categorizes keywords into 'high' and 'low' importance using Gemini.
+    Keywords that came from extract_keywords are answered from its result without a new call.
     
     Args:
         keywords (List[str]): List of keywords to categorize
@@ -53,16 +94,51 @@ def categorize_keywords(keywords: List[str]) -> Dict[str, List[str]]:
     Raises:
         Exception: If Gemini API call fails
     """
+    with _prioritized_lock:
+        known = _prioritized_by_keywords.get(tuple(keywords))
+    if known is not None:
+        return {"high": list(known["high"]), "low": list(known["low"])}
     try:
         prompt = f"Categorize these keywords into 'high' and 'low' importance. Return a JSON object with format {{'high': [], 'low': []}}: {', '.join(keywords)}"
-        response = gemini_model.generate_content(prompt)
-        return json.loads(response.text)
+        response = model_router.generate(prompt, call_site="gemini_utils.categorize_keywords",
+                                         validate=model_router.json_validator(KEYWORDS_SCHEMA))
+        return repair_json(response.text, KEYWORDS_SCHEMA)
     except Exception as e:
         return {"high": keywords[:len(keywords)//2], "low": keywords[len(keywords)//2:]}
 
+def get_resume_match_analysis(job_description: str, resume_text: str) -> Dict:
+    """
+    Scores a resume against a job description in a single Gemini call.
+    
+    Args:
+        job_description (str): The job description text
+        resume_text (str): The resume text
+        
+    Returns:
+        Dict: 'overall_score' and 'technical_score' (0-100) plus 'keywords', a list of
+        {'keyword', 'priority', 'found', 'evidence'} entries
+        
+    Raises:
+        Exception: If Gemini API call fails or returns no usable JSON
+    """
+    try:
+        prompt = MATCH_ANALYSIS_PROMPT.format(job_description=clean_job_description(job_description),
+                                              resume_text=resume_text)
+        response = model_router.generate(prompt, call_site="gemini_utils.get_resume_match_analysis",
+                                         validate=model_router.json_validator(MATCH_ANALYSIS_SCHEMA))
+        result = repair_json(response.text, MATCH_ANALYSIS_SCHEMA)
+        return {
+            "overall_score": max(0, min(100, int(result["overall_score"]))),
+            "technical_score": max(0, min(100, int(result["technical_score"]))),
+            "keywords": [k for k in result.get("keywords", []) if isinstance(k, dict) and k.get("keyword")],
+        }
+    except Exception as e:
+        raise Exception(f"Failed to analyze resume match: {str(e)}")
+
 def get_resume_match_score(job_description: str, resume_text: str) -> Dict[str, int]:
     """
     Calculates resume match scores using Gemini.
+    View over get_resume_match_analysis.
     
     Args:
         job_description (str): The job description text
@@ -75,21 +151,10 @@ def get_resume_match_score(job_description: str, resume_text: str) -> Dict[str,
         Exception: If Gemini API call fails
     """
     try:
-        # Get overall match score
-        overall_prompt = f"Calculate an overall match score (percentage 0-100) between this job description and resume. Return only the number:\nJob Description: {job_description}\nResume: {resume_text}"
-        overall_response = gemini_model.generate_content(overall_prompt)
-        overall_score = int(overall_response.text.strip())
-        overall_score = max(0, min(100, overall_score))
-
-        # Get technical skills match score
-        technical_prompt = f"Calculate a technical skills match score (percentage 0-100) between this job description and resume, focusing only on technical skills, tools, and technologies. Return only the number:\nJob Description: {job_description}\nResume: {resume_text}"
-        technical_response = gemini_model.generate_content(technical_prompt)
-        technical_score = int(technical_response.text.strip())
-        technical_score = max(0, min(100, technical_score))
-
+        analysis = get_resume_match_analysis(job_description, resume_text)
         return {
-            "overall_score": overall_score,
-            "technical_score": technical_score
+            "overall_score": analysis["overall_score"],
+            "technical_score": analysis["technical_score"]
         }
     except Exception as e:
         # Return default scores if API fails
@@ -98,6 +163,14 @@ def get_resume_match_score(job_description: str, resume_text: str) -> Dict[str,
             "technical_score": 50
         }
 
+def _tailor_prompt(job_description: str, resume_section: str, instructions: str) -> str:
+    return f"""
+        Given this job description: {clean_job_description(job_description)}
+        And this resume section: {resume_section}
+        Please {instructions}
+        Keep the same format but improve the content to better match the job description.
+        """
+
 def generate_tailored_resume_section(job_description: str, resume_section: str, instructions: str) -> str:
     """
     Generates tailored resume content using Gemini.
@@ -114,14 +187,37 @@ def generate_tailored_resume_section(job_description: str, resume_section: str,
         Exception: If Gemini API call fails
     """
     try:
-        prompt = f"""
-        Given this job description: {job_description}
-        And this resume section: {resume_section}
-        Please {instructions}
-        Keep the same format but improve the content to better match the job description.
-        """
-        response = gemini_model.generate_content(prompt)
+        prompt = _tailor_prompt(job_description, resume_section, instructions)
+        response = model_router.generate(prompt, call_site="gemini_utils.generate_tailored_resume_section",
+                                         validate=lambda text: bool(text.strip()))
         return response.text.strip()
     except Exception as e:
         # Return original content if API fails
         return resume_section
+
+def stream_tailored_resume_section(job_description: str, resume_section: str, instructions: str) -> Iterator[str]:
+    """
+    Streaming variant of generate_tailored_resume_section.
+    
+    Args:
+        job_description (str): The job description text
+        resume_section (str): The current resume section content
+        instructions (str): Additional instructions for tailoring
+        
+    Yields:
+        str: Chunks of tailored content as Gemini produces them, or the original
+        section if the request fails before any output arrives
+        
+    Raises:
+        Exception: If the stream breaks after partial output was yielded
+    """
+    prompt = _tailor_prompt(job_description, resume_section, instructions)
+    emitted = False
+    try:
+        for chunk in model_router.stream(prompt, call_site="gemini_utils.stream_tailored_resume_section"):
+            emitted = True
+            yield chunk
+    except Exception as e:
+        if emitted:
+            raise Exception(f"Tailoring stream interrupted: {str(e)}")
+        yield resume_section
@@ -0,0 +1,156 @@
+import os
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List
+
+from .llm_ledger import estimate_tokens
+from .keyword_matcher import get_matcher
+
+# Set JD_STRIP_BOILERPLATE=0 to send job descriptions to the model untouched
+STRIP_ENABLED = os.getenv("JD_STRIP_BOILERPLATE", "1") != "0"
+
+# If stripping would keep less than this share of the text, the original is used instead
+MIN_KEEP_RATIO = 0.2
+
+# Headings that open a section of company, benefits or application text
+BOILERPLATE_HEADINGS = [
+    "About Us", "About the company", "Who we are", "Our Story", "Our Mission",
+    "Our Offer", "What we offer", "What We Offer", "We offer", "Benefits", "Perks", "Compensation", "Salary",
+    "Equal Opportunity", "EEO", "Diversity", "Application Process", "How to Apply", "To Apply",
+    "Next steps", "Process:", "Important:", "Location:",
+]
+
+# Headings that open a section describing the role itself
+REQUIREMENT_HEADINGS = [
+    "Role Description", "Job Description", "Responsibilities", "Key Responsibilities",
+    "What you'll do", "What You Will Do", "Requirements", "Qualifications", "Skills",
+    "Must have", "Nice to have", "Preferred", "Tech Stack", "Who you are", "You have",
+]
+
+_BOILERPLATE_CUES = re.compile(
+    r"equal opportunit|employer|applicant|\bapply\b|application process|application form|your application|resume|\bcv\b|benefit|holiday|paid|"
+    r"insurance|salary|compensation|perk|we value|our mission|founded|headquarter|visa|click|linkedin|"
+    r"interview|reply|respond|background check|accommodation|divers|inclus|welcome|stealth|"
+    r"team event|we help|we are a|join us|excited", re.IGNORECASE)
+
+_REQUIREMENT_CUES = re.compile(
+    r"experience|proficien|knowledge|skill|familiar|degree|bachelor|master|must|required|"
+    r"responsib|develop|design|build|implement|maintain|strong|ability to|years?\b|understanding|"
+    r"frameworks?|programming|databases?|cloud|testing", re.IGNORECASE)
+
+# Tokens that look like technologies: CamelCase, acronyms, or with digits or + # . /
+_TECH_TOKEN = re.compile(r"^(?:[A-Z][a-z]+[A-Z]\w*|[A-Z]{2,}\w*|\w*[+#]+|\w+[./]\w+|\w*\d\w*)$")
+
+def _heading_pattern(headings: List[str]) -> str:
+    return "|".join(re.escape(h) for h in sorted(headings, key=len, reverse=True))
+
+# Headings are often glued to the previous sentence in pasted postings ("RemoteAbout Us")
+_SECTION_SPLIT = re.compile(
+    rf"(?=(?:{_heading_pattern(BOILERPLATE_HEADINGS + REQUIREMENT_HEADINGS)}))")
+_BOILERPLATE_START = re.compile(rf"^(?:{_heading_pattern(BOILERPLATE_HEADINGS)})")
+_REQUIREMENT_START = re.compile(rf"^(?:{_heading_pattern(REQUIREMENT_HEADINGS)})")
+# Sentence ends, including ones glued to the next sentence ("...Sequelize.Design and ...")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|(?<=[a-z)][.!?])(?=[A-Z])|\n+|\s*[•·▪●]\s*")
+
+@dataclass(frozen=True)
+class CleanedDescription:
+    text: str
+    original_chars: int
+    original_tokens: int
+
+    @property
+    def saved_chars(self) -> int:
+        return max(0, self.original_chars - len(self.text))
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.original_tokens - estimate_tokens(self.text))
+
+def _tech_density(sentence: str) -> float:
+    tokens = re.findall(r"[\w+#./]+", sentence)
+    if not tokens:
+        return 0.0
+    return sum(1 for t in tokens if _TECH_TOKEN.match(t)) / len(tokens)
+
+def _keep(sentence: str, section: str) -> bool:
+    """
+    Scores one sentence: requirement wording and technology-like tokens count for it,
+    company, benefits and application wording against it, weighted by its section.
+    """
+    score = 2 * _tech_density(sentence)
+    score += 0.5 * len(_REQUIREMENT_CUES.findall(sentence))
+    score -= 0.75 * len(_BOILERPLATE_CUES.findall(sentence))
+    if section == "requirements":
+        score += 0.5
+    elif section == "boilerplate":
+        score -= 0.75
+    return score >= 0
+
+def _known_keywords():
+    """
+    Matcher over the offline extractor's gazetteer (few-shot example keywords, known
+    technologies and soft skills, the skill table): a sentence naming one of them is a
+    requirement wherever it appears, e.g. "a preference for Github profile" under an
+    application heading.
+    """
+    # Imported here: local_keywords cleans descriptions with this module
+    from .local_keywords import gazetteer
+    return get_matcher(sorted(gazetteer()))
+
+@lru_cache(maxsize=256)
+def strip_boilerplate(job_description: str) -> CleanedDescription:
+    """
+    Drops company blurbs, benefits, equal-opportunity and application text from a job
+    description, keeping the sentences that describe the role and its requirements and
+    any sentence that names a known keyword.
+    Falls back to the original text when too little would be left.
+    """
+    original = job_description.strip()
+    known = _known_keywords()
+    kept, dropped = [], 0
+    for part in _SECTION_SPLIT.split(original):
+        part = part.strip()
+        if not part:
+            continue
+        section = ("boilerplate" if _BOILERPLATE_START.match(part)
+                   else "requirements" if _REQUIREMENT_START.match(part) else "other")
+        sentences = [s.strip() for s in _SENTENCE_SPLIT.split(part) if s and s.strip()]
+        for sentence in sentences:
+            if _keep(sentence, section) or known.found(sentence):
+                kept.append(sentence)
+            else:
+                dropped += 1
+    text = "\n".join(kept)
+    if not dropped or len(text) < MIN_KEEP_RATIO * len(original):
+        text = original
+    return CleanedDescription(text, len(job_description), estimate_tokens(job_description))
+
+_savings_lock = threading.Lock()
+_savings = {"descriptions": 0, "saved_chars": 0, "saved_tokens": 0, "original_tokens": 0}
+
+def clean_job_description(job_description: str, record: bool = True) -> str:
+    """
+    Returns the job description text to put in a prompt, stripped of boilerplate unless
+    JD_STRIP_BOILERPLATE=0. With `record`, the characters and tokens saved are added to
+    savings_stats(); pass False when the text is only needed for a cache key.
+    """
+    if not STRIP_ENABLED or not job_description:
+        return job_description
+    cleaned = strip_boilerplate(job_description)
+    if not record:
+        return cleaned.text
+    with _savings_lock:
+        _savings["descriptions"] += 1
+        _savings["saved_chars"] += cleaned.saved_chars
+        _savings["saved_tokens"] += cleaned.saved_tokens
+        _savings["original_tokens"] += cleaned.original_tokens
+    return cleaned.text
+
+def savings_stats() -> Dict[str, int]:
+    """
+    Returns totals of the prompts cleaned so far and the characters and tokens saved.
+    """
+    with _savings_lock:
+        return dict(_savings)
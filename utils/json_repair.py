@@ -0,0 +1,133 @@
+import json
+import json5
+from typing import Any, Iterator, List
+
+# How many cut points before the end of a truncated reply are tried
+MAX_TRUNCATION_CUTS = 32
+# How many opening brackets are tried as the start of the document
+MAX_DOCUMENT_STARTS = 16
+
+class JSONRepairError(ValueError):
+    """
+    Raised when no local repair produces JSON that matches the expected schema.
+    """
+
+def matches_schema(value: Any, schema: Any) -> bool:
+    """
+    Checks a parsed value against a minimal schema:
+      - None accepts anything
+      - a type, or tuple of types, is an isinstance check
+      - [item_schema] is a list whose items all match item_schema
+      - {key: schema} is a dict containing every key, each matching its schema
+    """
+    if schema is None:
+        return True
+    if isinstance(schema, (type, tuple)):
+        return isinstance(value, schema)
+    if isinstance(schema, list):
+        return isinstance(value, list) and all(matches_schema(item, schema[0]) for item in value)
+    if isinstance(schema, dict):
+        return isinstance(value, dict) and all(
+            key in value and matches_schema(value[key], sub_schema) for key, sub_schema in schema.items())
+    return False
+
+def _document_starts(text: str) -> Iterator[int]:
+    """
+    Yields the position of every "{" and "[", in order: the document may follow a
+    bracket in the surrounding text, e.g. "[1] Here is the JSON: {...}".
+    """
+    found = 0
+    for i, c in enumerate(text):
+        if c in "{[":
+            yield i
+            found += 1
+            if found == MAX_DOCUMENT_STARTS:
+                return
+
+def _scan(text: str):
+    """
+    Returns (closers for open brackets, inside a string?, comma positions, end of document or None).
+    """
+    stack: List[str] = []
+    commas: List[int] = []
+    in_string = escape = False
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+        elif c in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return stack, in_string, commas, i + 1
+        elif c == ",":
+            commas.append(i)
+    return stack, in_string, commas, None
+
+def _close(text: str) -> str:
+    """
+    Closes an unterminated string and every open bracket, dropping a dangling separator.
+    """
+    stack, in_string, _, _ = _scan(text)
+    if in_string:
+        if text.endswith("\\"):
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip()
+    while text and text[-1] in ",:":
+        text = text[:-1].rstrip()
+    return text + "".join(reversed(stack))
+
+def _candidates(text: str) -> Iterator[str]:
+    stack, _, commas, end = _scan(text)
+    if end is not None:
+        # Complete document: ignore whatever follows it, e.g. a closing code fence
+        yield text[:end]
+        return
+    yield _close(text)
+    # Truncated document: also try cutting back to earlier element boundaries
+    for cut in reversed(commas[-MAX_TRUNCATION_CUTS:]):
+        yield _close(text[:cut])
+
+def _loads(candidate: str) -> Any:
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+    # Relaxed syntax: single quotes, trailing commas, comments, unquoted keys
+    return json5.loads(candidate)
+
+def repair_json(text: str, schema: Any = None) -> Any:
+    """
+    Parses model output that should be JSON, repairing it locally before anyone gives up
+    or asks the model again:
+      1. drops code fences and text around the document
+      2. parses strictly, then with json5 for relaxed syntax
+      3. closes truncated strings, arrays and objects, cutting back element by element
+      4. returns the first result that matches `schema` (see matches_schema)
+    Each opening bracket, up to MAX_DOCUMENT_STARTS, is tried as the start of the
+    document until one works.
+    Raises JSONRepairError when nothing works.
+    """
+    text = text or ""
+    found = False
+    for start in _document_starts(text):
+        found = True
+        for candidate in _candidates(text[start:]):
+            try:
+                value = _loads(candidate)
+            except ValueError:
+                continue
+            if matches_schema(value, schema):
+                return value
+    if not found:
+        raise JSONRepairError("No JSON object or array found in response")
+    raise JSONRepairError("Response is not valid JSON for the expected schema, even after repair")
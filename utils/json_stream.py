@@ -0,0 +1,128 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+class _Frame:
+    __slots__ = ("kind", "start", "key", "last_key", "expect_key")
+
+    def __init__(self, kind: str, start: int, key: Optional[str]):
+        self.kind = kind            # "{" or "["
+        self.start = start          # buffer index of the opening bracket
+        self.key = key              # key this container was stored under in its parent
+        self.last_key = None        # most recent key read inside an object
+        self.expect_key = kind == "{"
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a single JSON document arriving in chunks.
+
+    `feed` returns (key, value) events as soon as a watched object closes: each object
+    inside an array stored under one of `item_keys` (key None watches the top-level
+    array, e.g. a bare list of projects).
+
+    Text before the document and after it, such as markdown code fences, is ignored. A
+    bracketed span that closes without being valid JSON of the watched shape (an array
+    for item key None, otherwise an object), like "[1]" or "[see below]", is taken as
+    part of that text and the search resumes after its opening bracket.
+    """
+
+    def __init__(self, item_keys: Sequence[Optional[str]] = ("projects",)):
+        self.item_keys = set(item_keys)
+        self.text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._doc_start: Optional[int] = None
+        self._doc_end: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        return self._doc_end is not None
+
+    def feed(self, chunk: str) -> List[Tuple[Optional[str], Any]]:
+        """
+        Consumes the next chunk and returns the events completed by it.
+        """
+        self.text += chunk
+        events = []
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._close_string(i)
+                continue
+
+            if not self._stack:
+                # Outside the document: skip fences and chatter until it opens
+                if c in "{[":
+                    self._doc_start = i
+                    self._stack.append(_Frame(c, i, None))
+                continue
+
+            frame = self._stack[-1]
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                key = frame.last_key if frame.kind == "{" else frame.key
+                self._stack.append(_Frame(c, i, key))
+            elif c in "}]":
+                self._stack.pop()
+                event = self._close_container(frame, i)
+                if event is not None:
+                    events.append(event)
+                if not self._stack:
+                    if not self._is_document(self._load(self._doc_start, i)):
+                        self._pos = self._doc_start + 1
+                        self._doc_start = None
+                    else:
+                        self._doc_end = i + 1
+            elif c == ":" and frame.kind == "{":
+                frame.expect_key = False
+            elif c == "," and frame.kind == "{":
+                frame.expect_key = True
+        return events
+
+    def _is_document(self, value: Any) -> bool:
+        kinds = set()
+        if None in self.item_keys:
+            kinds.add(list)
+        if self.item_keys - {None}:
+            kinds.add(dict)
+        return value is not None and (not kinds or isinstance(value, tuple(kinds)))
+
+    def _close_string(self, end: int) -> None:
+        frame = self._stack[-1]
+        if frame.kind == "{" and frame.expect_key:
+            frame.last_key = json.loads(self.text[self._string_start:end + 1])
+
+    def _close_container(self, frame: _Frame, end: int) -> Optional[Tuple[Optional[str], Any]]:
+        parent = self._stack[-1] if self._stack else None
+        if frame.kind == "{" and parent is not None and parent.kind == "[" and parent.key in self.item_keys:
+            if parent.key is not None or parent is self._stack[0]:
+                return parent.key, self._load(frame.start, end)
+        return None
+
+    def _load(self, start: int, end: int) -> Any:
+        try:
+            return json.loads(self.text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+
+    def result(self) -> Any:
+        """
+        Returns the whole parsed document once it has closed, otherwise None.
+        """
+        if not self.done:
+            return None
+        return self._load(self._doc_start, self._doc_end - 1)
@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Runs of word characters, the same characters \b treats as word characters
+WORD_RUN = re.compile(r"\w+")
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class KeywordMatcher:
+    """
+    Finds every keyword of a fixed set in a text in one pass, case-insensitively and on
+    whole words: a keyword edge that is a word character must not touch another word
+    character in the text ("Java" is not found in "JavaScript"). Edges like the "++" of
+    "C++" or the "." of ".NET" need no boundary.
+
+    Each keyword is indexed under its first run of word characters. The text's word runs
+    are scanned once and only keywords indexed under a run are compared there, so a scan
+    costs O(text + candidates) whatever the number of keywords. Overlapping keywords
+    ("machine learning" and "learning") are each found.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        # first word run -> [(lowercased keyword, offset of the run in it)]
+        self._index: Dict[str, List[Tuple[str, int]]] = {}
+        # Keywords without any word character, matched as plain substrings
+        self._symbols: List[str] = []
+        for keyword in self.keywords:
+            lowered = keyword.lower().strip()
+            if not lowered:
+                continue
+            run = WORD_RUN.search(lowered)
+            if run is None:
+                self._symbols.append(lowered)
+                continue
+            entry = (lowered, run.start())
+            candidates = self._index.setdefault(run.group(), [])
+            if entry not in candidates:
+                candidates.append(entry)
+
+    def find_all(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Returns (lowercased keyword, start, end) for every occurrence, in text order.
+        Spans index the lowercased text, which lines up with the original text except
+        for the rare characters whose lowercase form is longer.
+        """
+        text = text.lower()
+        spans = []
+        for run in WORD_RUN.finditer(text):
+            for keyword, offset in self._index.get(run.group(), ()):
+                start = run.start() - offset
+                end = start + len(keyword)
+                if start < 0 or not text.startswith(keyword, start):
+                    continue
+                if is_word_char(keyword[0]) and start > 0 and is_word_char(text[start - 1]):
+                    continue
+                if is_word_char(keyword[-1]) and end < len(text) and is_word_char(text[end]):
+                    continue
+                spans.append((keyword, start, end))
+        for keyword in self._symbols:
+            start = text.find(keyword)
+            while start != -1:
+                spans.append((keyword, start, start + len(keyword)))
+                start = text.find(keyword, start + 1)
+        spans.sort(key=lambda span: (span[1], span[2]))
+        return spans
+
+    def found(self, text: str) -> Set[str]:
+        """
+        Returns the lowercased keywords that occur in the text.
+        """
+        return {keyword for keyword, _, _ in self.find_all(text)}
+
+    def matches(self, text: str) -> Dict[str, bool]:
+        """
+        Returns {keyword: whether it occurs in the text} for every keyword, as given.
+        """
+        found = self.found(text)
+        return {keyword: keyword.lower().strip() in found for keyword in self.keywords}
+
+@lru_cache(maxsize=256)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+def get_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """
+    Returns the matcher for a keyword set, built once per distinct set.
+    """
+    return _cached_matcher(tuple(keywords))
@@ -1,8 +1,18 @@
 import os
+import base64
+import shutil
+import hashlib
+import threading
 import subprocess
 import tempfile
 import streamlit as st
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Compiled previews by content hash, so an unchanged resume is never recompiled
+_preview_cache: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+_preview_lock = threading.Lock()
+PREVIEW_CACHE_SIZE = 32
 
 def compile_latex_to_pdf(tex_content, output_dir=None):
     """
@@ -78,3 +88,57 @@ def update_latex_content(template_path, replacements):
     except Exception as e:
         st.error(f"Error updating LaTeX content: {str(e)}")
         return None
+
+def compile_preview(tex_content: str, cls_path: str = "resumes/resume.cls") -> Tuple[Optional[str], Optional[str]]:
+    """
+    Compiles LaTeX content for the in-page preview without touching the Streamlit UI,
+    so it can also run in a background thread.
+    
+    Args:
+        tex_content (str): The LaTeX content to compile
+        cls_path (str, optional): Document class copied next to the .tex file
+        
+    Returns:
+        tuple: (base64-encoded PDF, None) on success or (None, error message) on failure
+    """
+    key = hashlib.sha256(tex_content.encode("utf-8")).hexdigest()
+    with _preview_lock:
+        if key in _preview_cache:
+            return _preview_cache[key]
+
+    result = _compile_preview(tex_content, Path(cls_path))
+    if result[0] is not None:
+        with _preview_lock:
+            if len(_preview_cache) >= PREVIEW_CACHE_SIZE:
+                _preview_cache.pop(next(iter(_preview_cache)))
+            _preview_cache[key] = result
+    return result
+
+def _compile_preview(tex_content: str, cls_path: Path) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_dir_path = Path(temp_dir)
+            
+            if not cls_path.exists():
+                return None, f"{cls_path.name} not found. Please ensure it exists in the resumes directory."
+            shutil.copy2(cls_path, temp_dir_path / cls_path.name)
+            
+            tex_file = temp_dir_path / "resume.tex"
+            tex_file.write_text(tex_content)
+            
+            # Run pdflatex twice to resolve references
+            for _ in range(2):
+                result = subprocess.run(
+                    ['pdflatex', '-interaction=nonstopmode', 'resume.tex'],
+                    cwd=temp_dir,
+                    capture_output=True,
+                    text=True
+                )
+            
+            pdf_path = temp_dir_path / "resume.pdf"
+            if pdf_path.exists():
+                return base64.b64encode(pdf_path.read_bytes()).decode(), None
+            error_msg = result.stderr if result.stderr else result.stdout
+            return None, f"LaTeX compilation failed. Error: {error_msg}"
+    except Exception as e:
+        return None, f"Error generating PDF: {str(e)}"
@@ -0,0 +1,327 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .llm_cache import make_cache_key
+
+# Which backend serves model calls: "gemini" (the real API), "standin" (utils/llm_standin.py),
+# "record" (real API, saving every reply to the cassette) or "replay" (cassette only)
+BACKEND = os.getenv("LLM_BACKEND", "gemini")
+STANDIN_URL = os.getenv("LLM_STANDIN_URL", "http://127.0.0.1:8765")
+CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", os.path.join(".cache", "llm_cassette.json"))
+# Replay waits as long as the recorded call took, so latency measurements stay meaningful
+CASSETTE_REPLAY_LATENCY = os.getenv("LLM_CASSETTE_REPLAY_LATENCY", "1") != "0"
+
+# The Gemini key may be set under either name; GEMINI_API_KEY wins when both are
+API_KEY_VARS = ("GEMINI_API_KEY", "GOOGLE_API_KEY")
+
+class BackendError(Exception):
+    """
+    Raised by non-Gemini backends for failed calls; the message carries the HTTP status
+    so quota errors ("429 ...") are retried like the real API's.
+    """
+
+class MissingAPIKey(ValueError):
+    """
+    Raised on the first Gemini call when neither API key variable is set.
+    """
+
+class CassetteMiss(BackendError):
+    """
+    Raised in replay mode for a request that was never recorded.
+    """
+
+class _Response:
+    """
+    The parts of a GenerateContentResponse the app reads: text and usage_metadata.
+    """
+
+    def __init__(self, text: str, usage: Optional[dict] = None):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(**usage) if usage else None
+
+class _StreamResponse:
+    """
+    Async iterator of _Response chunks, like a streamed GenerateContentResponse.
+    """
+
+    def __init__(self, chunks: AsyncIterator[_Response]):
+        self._chunks = chunks
+        self.usage_metadata = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> _Response:
+        chunk = await self._chunks.__anext__()
+        if chunk.usage_metadata is not None:
+            self.usage_metadata = chunk.usage_metadata
+        return chunk
+
+def api_key() -> Optional[str]:
+    """
+    Returns the Gemini API key from GEMINI_API_KEY or GOOGLE_API_KEY.
+    """
+    for name in API_KEY_VARS:
+        value = os.getenv(name)
+        if value:
+            return value
+    return None
+
+class GeminiBackend:
+    """
+    The real google-generativeai client. The SDK is imported and configured on the first
+    model request, once per process: every model then shares the SDK's client and its
+    channel, so calls reuse open connections instead of each paying for a new one.
+    """
+
+    name = "gemini"
+
+    def __init__(self):
+        self._configured = False
+        self._lock = threading.Lock()
+
+    def configure(self):
+        """
+        Configures the SDK if it is not yet, and returns the genai module.
+        """
+        import google.generativeai as genai
+        with self._lock:
+            if not self._configured:
+                key = api_key()
+                if not key:
+                    raise MissingAPIKey("""Gemini API key not found! Please follow these steps:
+    1. Create a file named '.env' (not '.env.example') in your project directory
+    2. Add this line to the file: GEMINI_API_KEY=your_actual_api_key_here
+    3. Get an API key from https://makersuite.google.com/app/apikey if you don't have one
+    """)
+                genai.configure(api_key=key)
+                self._configured = True
+        return genai
+
+    def get_model(self, model_name: str, generation_config: Optional[dict] = None):
+        genai = self.configure()
+        return genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+
+class StandInModel:
+    """
+    Model that sends requests to the local stand-in server over HTTP.
+    """
+
+    def __init__(self, url: str, model_name: str, generation_config: Optional[dict] = None):
+        self.url = url.rstrip("/") + "/v1/generate"
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        self._generation_config = generation_config
+
+    def _open(self, prompt, stream: bool):
+        # urllib.request pulls in ssl and http.client, so it is only loaded for the stand-in
+        import urllib.error
+        import urllib.request
+        body = json.dumps({"model": self.model_name, "prompt": prompt if isinstance(prompt, str) else str(prompt),
+                           "generation_config": self._generation_config, "stream": stream}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            return urllib.request.urlopen(request, timeout=600)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", "")
+            except ValueError:
+                message = ""
+            raise BackendError(message or f"{e.code} {e.reason}") from None
+        except urllib.error.URLError as e:
+            raise BackendError(f"Stand-in server unreachable at {self.url}: {e.reason}") from None
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, self._open, prompt, stream)
+        if not stream:
+            with response:
+                body = json.loads(response.read())
+            return _Response(body["text"], body.get("usage"))
+        return _StreamResponse(self._read_stream(loop, response))
+
+    async def _read_stream(self, loop, response) -> AsyncIterator[_Response]:
+        try:
+            while True:
+                line = await loop.run_in_executor(None, response.readline)
+                if not line:
+                    break
+                event = json.loads(line)
+                yield _Response(event.get("text", ""), event.get("usage"))
+        finally:
+            response.close()
+
+class StandInBackend:
+    """
+    Backend for the local stand-in server (see utils/llm_standin.py).
+    """
+
+    name = "standin"
+
+    def __init__(self, url: str = STANDIN_URL):
+        self.url = url
+
+    def get_model(self, model_name: str, generation_config: Optional[dict] = None):
+        return StandInModel(self.url, model_name, generation_config)
+
+class Cassette:
+    """
+    JSON file of recorded replies keyed by model, generation config, prompt and streaming.
+    """
+
+    def __init__(self, path: str = CASSETTE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, dict]] = None
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                self._entries = {}
+        return self._entries
+
+    @staticmethod
+    def key(model_name: str, generation_config: Optional[dict], prompt, stream: bool) -> str:
+        text = prompt if isinstance(prompt, str) else repr(prompt)
+        return make_cache_key(model_name, {"generation_config": generation_config, "stream": stream}, text)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, entry: dict) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = entry
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+class CassetteModel:
+    """
+    Model wrapper that records another model's replies, or replays recorded ones.
+    """
+
+    def __init__(self, cassette: Cassette, model_name: str, generation_config: Optional[dict],
+                 inner=None):
+        self.cassette = cassette
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        self._generation_config = generation_config
+        self._inner = inner
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        key = Cassette.key(self.model_name, self._generation_config, prompt, stream)
+        if self._inner is None:
+            return await self._replay(key, stream)
+
+        start = time.perf_counter()
+        response = await self._inner.generate_content_async(prompt, stream=stream, **kwargs)
+        if not stream:
+            self._save(key, [response.text], start, getattr(response, "usage_metadata", None))
+            return response
+        return _StreamResponse(self._record_stream(key, response, start))
+
+    async def _record_stream(self, key: str, response, start: float) -> AsyncIterator[_Response]:
+        chunks: List[str] = []
+        async for chunk in response:
+            chunks.append(chunk.text)
+            yield _Response(chunk.text)
+        self._save(key, chunks, start, getattr(response, "usage_metadata", None))
+
+    def _save(self, key: str, chunks: List[str], start: float, usage: Any) -> None:
+        usage_dict = None
+        if usage is not None:
+            usage_dict = {name: getattr(usage, name, None) for name in ("prompt_token_count", "candidates_token_count")}
+        self.cassette.put(key, {"model": self.model_name, "chunks": chunks, "usage": usage_dict,
+                                "latency_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+    async def _replay(self, key: str, stream: bool):
+        entry = self.cassette.get(key)
+        if entry is None:
+            raise CassetteMiss(f"No recorded reply for this {self.model_name} request in {self.cassette.path}")
+        if CASSETTE_REPLAY_LATENCY:
+            await asyncio.sleep(entry.get("latency_ms", 0) / 1000)
+        if not stream:
+            return _Response("".join(entry["chunks"]), entry.get("usage"))
+
+        async def chunks() -> AsyncIterator[_Response]:
+            for text in entry["chunks"]:
+                yield _Response(text)
+            if entry.get("usage"):
+                yield _Response("", entry["usage"])
+        return _StreamResponse(chunks())
+
+class CassetteBackend:
+    """
+    Records the real backend's replies to a cassette, or replays them without a network.
+    """
+
+    def __init__(self, mode: str, path: str = CASSETTE_PATH, inner=None):
+        self.name = mode
+        self.cassette = Cassette(path)
+        self._inner = inner if mode == "record" else None
+
+    def get_model(self, model_name: str, generation_config: Optional[dict] = None):
+        inner = self._inner.get_model(model_name, generation_config) if self._inner is not None else None
+        return CassetteModel(self.cassette, model_name, generation_config, inner)
+
+def create_backend(name: str = BACKEND):
+    """
+    Builds the backend selected by LLM_BACKEND.
+    """
+    if name == "gemini":
+        return GeminiBackend()
+    if name == "standin":
+        return StandInBackend()
+    if name in ("record", "replay"):
+        return CassetteBackend(name, inner=GeminiBackend())
+    raise ValueError(f"Unknown LLM_BACKEND '{name}', expected gemini, standin, record or replay")
+
+_backend = None
+_backend_lock = threading.Lock()
+# Models built so far, per (backend, model name, generation config)
+_models: Dict[tuple, Any] = {}
+
+def get_backend():
+    """
+    Returns the process-wide backend, creating it on first use.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+        return _backend
+
+def set_backend(backend) -> None:
+    """
+    Replaces the process-wide backend, e.g. with a StandInBackend in a benchmark.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+        _models.clear()
+
+def get_model(model_name: str, generation_config: Optional[dict] = None):
+    """
+    Returns the current backend's model for a name and generation config, built on first
+    use and shared by every caller after that.
+    """
+    backend = get_backend()
+    key = (id(backend), model_name, repr(sorted((generation_config or {}).items())))
+    with _backend_lock:
+        model = _models.get(key)
+        if model is None:
+            model = backend.get_model(model_name, generation_config)
+            _models[key] = model
+    return model
@@ -0,0 +1,181 @@
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional, Tuple
+
+# "{pid}" is replaced by the writing process's id: RotatingFileHandler is not safe with
+# several processes (e.g. Streamlit servers) rotating one file, so each writes its own
+DEFAULT_LEDGER_PATH = os.getenv("LLM_LEDGER_PATH", os.path.join(".cache", "llm_ledger.{pid}.jsonl"))
+LEDGER_MAX_BYTES = int(os.getenv("LLM_LEDGER_MAX_BYTES", 5 * 1024 * 1024))
+LEDGER_BACKUPS = int(os.getenv("LLM_LEDGER_BACKUPS", 5))
+
+# Latency samples kept per call site for percentile estimates
+SAMPLES_PER_SITE = 1000
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token) used when the API reports no usage.
+    """
+    return max(1, len(text) // 4)
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of `samples` (0 when empty).
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+class CallLedger:
+    """
+    Records one entry per LLM call: call site, model, prompt/response bytes, token usage,
+    latency and outcome. Entries are appended to a size-rotated JSONL file and folded into
+    an in-memory per-call-site summary.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_LEDGER_PATH,
+                 max_bytes: int = LEDGER_MAX_BYTES, backups: int = LEDGER_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._logger: Optional[logging.Logger] = None
+        self._logger_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=SAMPLES_PER_SITE))
+        # (call site, model) -> latencies; sites differ too much in payload to share a baseline
+        self._model_latencies: Dict[Tuple[str, str], deque] = defaultdict(lambda: deque(maxlen=SAMPLES_PER_SITE))
+        self._totals: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def file_path(self) -> Optional[str]:
+        """
+        Returns the file this process writes, with "{pid}" in the path filled in.
+        """
+        return self.path.replace("{pid}", str(os.getpid())) if self.path else None
+
+    def _get_logger(self) -> Optional[logging.Logger]:
+        # A forked child must not keep writing (and rotating) its parent's file
+        if self.path and (self._logger is None or self._logger_pid != os.getpid()):
+            path = self.file_path()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            logger = logging.getLogger(f"llm_ledger.{path}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            if not logger.handlers:
+                handler = RotatingFileHandler(path, maxBytes=self.max_bytes,
+                                              backupCount=self.backups, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+            self._logger = logger
+            self._logger_pid = os.getpid()
+        return self._logger
+
+    def record(self, call_site: str, model: str, prompt: Any, response_text: Optional[str],
+               latency_ms: float, outcome: str, usage: Any = None, error: Optional[str] = None,
+               **extra: Any) -> Dict[str, Any]:
+        """
+        Adds one call to the ledger. `usage` is the response's usage_metadata when the
+        SDK provides it; otherwise token counts are estimated from the text.
+        """
+        prompt_text = prompt if isinstance(prompt, str) else str(prompt)
+        response_text = response_text or ""
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+        entry = {
+            "time": time.time(),
+            "call_site": call_site,
+            "model": model,
+            "prompt_bytes": len(prompt_text.encode("utf-8")),
+            "response_bytes": len(response_text.encode("utf-8")),
+            "prompt_tokens": prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt_text),
+            "output_tokens": output_tokens if output_tokens is not None else (
+                estimate_tokens(response_text) if response_text else 0),
+            "tokens_estimated": prompt_tokens is None,
+            "latency_ms": round(latency_ms, 1),
+            "outcome": outcome,
+        }
+        if error:
+            entry["error"] = error
+        entry.update(extra)
+
+        with self._lock:
+            # A cancelled call's duration says when it was abandoned, not how fast the API was
+            if outcome != "cancelled":
+                self._latencies[call_site].append(latency_ms)
+                if outcome == "ok" and not extra.get("streamed"):
+                    self._model_latencies[(call_site, model)].append(latency_ms)
+            totals = self._totals[call_site]
+            totals["calls"] += 1
+            totals[outcome] += 1
+            totals["prompt_tokens"] += entry["prompt_tokens"]
+            totals["output_tokens"] += entry["output_tokens"]
+            totals["prompt_bytes"] += entry["prompt_bytes"]
+            totals["response_bytes"] += entry["response_bytes"]
+
+        try:
+            logger = self._get_logger()
+            if logger is not None:
+                logger.info(json.dumps(entry, ensure_ascii=False))
+        except OSError as e:
+            print(f"LLM ledger write failed: {e}")
+        return entry
+
+    def latency_percentile(self, call_site: str, pct: float) -> float:
+        """
+        Returns the given latency percentile (ms) observed for a call site.
+        """
+        with self._lock:
+            samples = list(self._latencies.get(call_site, ()))
+        return percentile(samples, pct)
+
+    def model_latency_percentile(self, call_site: str, model: str, pct: float,
+                                 last: Optional[int] = None) -> float:
+        """
+        Returns the given latency percentile (ms) of a call site's successful non-streamed
+        calls to a model, over its `last` calls when given.
+        """
+        with self._lock:
+            samples = list(self._model_latencies.get((call_site, model), ()))
+        return percentile(samples[-last:] if last else samples, pct)
+
+    def model_sample_count(self, call_site: str, model: str) -> int:
+        """
+        Returns how many latency samples back the percentiles of a call site's model.
+        """
+        with self._lock:
+            return len(self._model_latencies.get((call_site, model), ()))
+
+    def sample_count(self, call_site: str) -> int:
+        """
+        Returns how many latency samples back the percentiles of a call site.
+        """
+        with self._lock:
+            return len(self._latencies.get(call_site, ()))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns per-call-site counts, token and byte totals, and p50/p95/p99 latency (ms).
+        """
+        with self._lock:
+            snapshot = {site: (list(self._latencies[site]), dict(totals))
+                        for site, totals in self._totals.items()}
+        summary = {}
+        for site, (samples, totals) in snapshot.items():
+            totals.update({
+                "p50_ms": round(percentile(samples, 50), 1),
+                "p95_ms": round(percentile(samples, 95), 1),
+                "p99_ms": round(percentile(samples, 99), 1),
+            })
+            summary[site] = totals
+        return summary
+
+# Process-wide ledger written by the Gemini gateway
+call_ledger = CallLedger()
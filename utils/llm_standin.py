@@ -0,0 +1,164 @@
+"""
+Local stand-in for the Gemini API, for running the app and benchmarks without a key.
+
+    python utils/llm_standin.py --port 8765 --latency-ms 800 --sigma 0.5 --error-rate 0.02
+
+Then start the app with LLM_BACKEND=standin (LLM_STANDIN_URL defaults to
+http://127.0.0.1:8765). Replies are shaped after the prompt (keyword lists, JSON scores,
+skills and projects, tailored text) and built from the prompt's own words. Latency is
+log-normal around --latency-ms. Errors and 429s are drawn at the given rates. Every draw
+is seeded by the prompt and how often it was seen, so runs repeat regardless of request
+interleaving.
+
+Uses only the standard library, so it runs as a plain script.
+"""
+import re
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SOFT_SKILLS = ["Communication", "Teamwork", "Problem Solving", "Collaboration", "Leadership"]
+
+def _subject(prompt: str) -> str:
+    """
+    The part of the prompt that describes the job, after any few-shot examples.
+    """
+    for marker in ("input:", "Job Description:", "Given this job description:", "Keywords:"):
+        if marker in prompt:
+            return prompt.rsplit(marker, 1)[1]
+    return prompt
+
+def _keywords(text: str, limit: int = 12) -> list:
+    candidates = re.findall(r"\b(?:[A-Z][A-Za-z0-9+#.]*[A-Za-z0-9+#]|[A-Z]{2,}|C\+\+|C#)", text)
+    seen = []
+    for word in candidates:
+        if word not in seen and word.lower() not in ("the", "we", "you", "our", "job", "this", "and"):
+            seen.append(word)
+    return seen[:limit]
+
+def respond(prompt: str, rng: random.Random) -> str:
+    """
+    Builds a plausible reply in the format the prompt asks for.
+    """
+    subject = _subject(prompt)
+    keywords = _keywords(subject)
+    soft = rng.sample(SOFT_SKILLS, 2)
+    if "id: jd" in prompt:
+        items = re.findall(r"id: (jd\d+)\ninput: (.*?)(?=\nid: jd\d+\n|\Z)", prompt, re.S)
+        return json.dumps([{"id": item_id, "high": _keywords(text), "low": soft} for item_id, text in items])
+    if "High Priority Keywords" in prompt:
+        return f"High Priority Keywords: {', '.join(keywords)}.\nLow Priority Keywords: {', '.join(soft)}."
+    if '"overall_score"' in prompt:
+        return json.dumps({"overall_score": rng.randint(40, 90), "technical_score": rng.randint(40, 90),
+                           "keywords": [{"keyword": k, "priority": "high", "found": rng.random() < 0.6,
+                                         "evidence": ""} for k in keywords]})
+    if '"technical_skills"' in prompt:
+        return json.dumps({"technical_skills": keywords, "soft_skills": soft,
+                           "projects": [{"title": f"{k} Service", "description": f"Built a {k} service.",
+                                         "tech_stack": [k]} for k in keywords[:3]]})
+    if '"tech_stack"' in prompt:
+        return json.dumps([{"name": f"{k} Platform", "description": f"Designed a {k} platform.",
+                            "tech_stack": [k]} for k in keywords[:3]])
+    if '"high"' in prompt:
+        return json.dumps({"high": keywords, "low": soft})
+    if "HIGH PRIORITY:" in prompt:
+        lines = ["HIGH PRIORITY:", "Technical Skills:"] + [f"- {k}" for k in keywords]
+        lines += ["Soft Skills:"] + [f"- {s}" for s in soft] + ["", "LOW PRIORITY:", "Technical Skills:", "Soft Skills:"]
+        return "\n".join(lines)
+    match = re.search(r"resume section: (.*?)\n\s*Please", prompt, re.S)
+    if match:
+        return match.group(1).strip()
+    return " ".join(keywords) or "OK"
+
+class StandInState:
+    def __init__(self, args):
+        self.args = args
+        self.lock = threading.Lock()
+        self.seen = {}
+
+    def rng_for(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self.lock:
+            count = self.seen.get(digest, 0)
+            self.seen[digest] = count + 1
+        return random.Random(f"{self.args.seed}:{digest}:{count}")
+
+def make_handler(state: StandInState):
+    args = state.args
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+        def _send_json(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt = request.get("prompt", "")
+            rng = state.rng_for(prompt)
+            latency = args.latency_ms / 1000 * math.exp(rng.gauss(0, args.sigma))
+            roll = rng.random()
+            if roll < args.quota_rate:
+                time.sleep(min(latency, 0.05))
+                return self._send_json(429, {"error": "429 Resource has been exhausted (stand-in)"})
+            if roll < args.quota_rate + args.error_rate:
+                time.sleep(latency)
+                return self._send_json(500, {"error": "500 Internal error (stand-in)"})
+
+            text = respond(prompt, rng)
+            usage = {"prompt_token_count": max(1, len(prompt) // 4),
+                     "candidates_token_count": max(1, len(text) // 4)}
+            if not request.get("stream"):
+                time.sleep(latency)
+                return self._send_json(200, {"text": text, "usage": usage})
+
+            # Stream: first chunk after the drawn latency, then one chunk per interval
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(latency)
+            for start in range(0, len(text), args.chunk_chars):
+                line = json.dumps({"text": text[start:start + args.chunk_chars]}).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+                time.sleep(args.chunk_delay_ms / 1000)
+            line = json.dumps({"usage": usage}).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n0\r\n\r\n")
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=800, help="median response latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal spread of latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 500")
+    parser.add_argument("--quota-rate", type=float, default=0.0, help="share of requests failing with 429")
+    parser.add_argument("--chunk-chars", type=int, default=40, help="characters per streamed chunk")
+    parser.add_argument("--chunk-delay-ms", type=float, default=30, help="delay between streamed chunks")
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StandInState(args)))
+    print(f"Gemini stand-in listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+from .jd_cleaner import clean_job_description
+from .keyword_matcher import get_matcher
+
+# Optional spaCy pipeline with a parser, for noun chunks; a blank English pipeline is
+# used when it is not installed, and plain gazetteer matching when spaCy itself is not
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+
+# Soft skills always rated low, on top of those in the few-shot examples
+SOFT_SKILLS = [
+    "communication", "communication skills", "teamwork", "collaboration", "leadership",
+    "problem-solving", "problem solving", "attention to detail", "time management",
+    "analytical skills", "critical thinking", "adaptability", "mentoring",
+]
+
+# Common technologies, always rated high, on top of those in the few-shot examples and the
+# skill table. Words that are also everyday English ("Go", "Express", "Shell", "Spring") are
+# left out and only found through the rules below.
+TECH_SKILLS = [
+    # Languages
+    "Python", "Java", "JavaScript", "TypeScript", "Golang", "Rust", "Kotlin", "Scala", "Ruby",
+    "PHP", "C++", "C#", "Objective-C", "Swift", "Dart", "Elixir", "Erlang", "Haskell", "Clojure",
+    "Perl", "Lua", "MATLAB", "Bash", "PowerShell", "SQL", "NoSQL", "HTML", "CSS", "Sass", "Solidity",
+    # Frameworks and libraries
+    "React", "React Native", "Angular", "Vue", "Vue.js", "Next.js", "Nuxt", "Svelte", "Node.js",
+    "Express.js", "NestJS", "Django", "Flask", "FastAPI", "Spring Boot", "Ruby on Rails", "Rails",
+    "Laravel", ".NET", "ASP.NET", "jQuery", "Redux", "GraphQL", "gRPC", "Protobuf", "REST",
+    "RESTful", "Android", "Android SDK", "iOS", "SwiftUI", "Jetpack", "Jetpack Compose",
+    "Coroutines", "Retrofit", "Flutter", "Xamarin", "Celery", "RabbitMQ", "WebSockets", "OAuth",
+    # Data and machine learning
+    "Kafka", "Apache Kafka", "Spark", "Apache Spark", "PySpark", "Hadoop", "Airflow", "Flink",
+    "dbt", "Snowflake", "Databricks", "BigQuery", "Redshift", "Hive", "Presto", "Trino",
+    "pandas", "NumPy", "SciPy", "scikit-learn", "PyTorch", "TensorFlow", "Keras", "JAX",
+    "Hugging Face", "transformers", "LangChain", "OpenCV", "XGBoost", "MLflow", "Kubeflow",
+    "machine learning", "deep learning", "NLP", "computer vision", "LLM", "MLOps", "ETL",
+    "Tableau", "Power BI", "Looker",
+    # Databases
+    "PostgreSQL", "Postgres", "MySQL", "MongoDB", "Redis", "Cassandra", "DynamoDB",
+    "Elasticsearch", "SQLite", "Oracle", "SQL Server", "Neo4j", "ClickHouse", "Firebase",
+    # Cloud, infrastructure and tooling
+    "AWS", "Azure", "GCP", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Ansible",
+    "Helm", "Jenkins", "GitHub Actions", "GitLab CI", "CircleCI", "CI/CD", "Linux", "Git",
+    "GitHub", "Prometheus", "Grafana", "Datadog", "Nginx", "Lambda", "EC2", "S3", "RDS",
+    "Serverless", "OpenShift", "Istio", "Nomad", "Consul", "Vault", "Gradle", "Maven",
+    "Webpack", "Vite", "Jest", "Pytest", "JUnit", "Selenium", "Cypress", "Jira", "Figma",
+]
+
+# Words that join the items of an enumeration ("Kafka, Spark and Airflow")
+_LIST_SEPARATORS = {",", "/", "&", "and", "or", "+"}
+
+# Tokens that look like technologies: CamelCase, acronyms (also with digits: "EC2", "S3"),
+# names ending in + or # ("C++"), ".js"-style names and acronym pairs ("CI/CD")
+_TECH_TOKEN = re.compile(
+    r"^(?:[A-Z][a-z]+[A-Z]\w*|[A-Z]{2,}[a-z]?|[A-Z][A-Z\d]*\d[A-Z\d]*|[A-Za-z]+[+#]+"
+    r"|[A-Za-z]+\.(?:js|io|net|py)|[A-Z]+/[A-Z]+)$")
+# Candidate tokens when spaCy is not available
+_WORD = re.compile(r"[\w+#]+(?:[./][\w+#]+)*")
+_CAMEL_CASE = re.compile(r"^[A-Z][a-z]+[A-Z]\w*$")
+_GLUED_PARTS = re.compile(r"[A-Z][a-z]+|[A-Z]+(?![a-z])")
+_EXAMPLE_OUTPUT = re.compile(
+    r"High Priority Keywords?:\s*(.*?)\.?\s*\n\s*Low Priority Keywords?:\s*(.*?)\.?\s*$", re.M)
+
+_lock = threading.Lock()
+_nlp = None
+_nlp_loaded = False
+_canonical: Dict[str, str] = {}
+_labels: Dict[str, str] = {}
+
+def _label_of(keyword: str) -> str:
+    return _labels.get(keyword.lower(), "HIGH")
+
+def _example_keywords() -> Tuple[List[str], List[str]]:
+    """
+    High and low keywords from the outputs of the few-shot examples in the Gemini prompts.
+    """
+    from .local_match_utils import prompt, compact_prompt
+    high, low = [], []
+    for high_part, low_part in _EXAMPLE_OUTPUT.findall(prompt + "\n" + compact_prompt):
+        high.extend(k.strip() for k in high_part.split(",") if k.strip())
+        low.extend(k.strip() for k in low_part.split(",") if k.strip())
+    return high, low
+
+def gazetteer() -> Dict[str, str]:
+    """
+    Returns {keyword: "HIGH" | "LOW"}: the few-shot examples, SOFT_SKILLS, TECH_SKILLS and
+    the skill table's past classifications (technical skills high, soft skills low).
+    """
+    from .skill_table import skill_table, UNKNOWN
+    terms: Dict[str, str] = {}
+    high, low = _example_keywords()
+    for keyword in high:
+        terms.setdefault(keyword, "HIGH")
+    for keyword in low + SOFT_SKILLS:
+        terms.setdefault(keyword, "LOW")
+    for keyword in TECH_SKILLS:
+        terms.setdefault(keyword, "HIGH")
+    for keyword, (category, _) in skill_table.entries().items():
+        if category != UNKNOWN:
+            terms.setdefault(keyword, "HIGH" if category == "technical" else "LOW")
+    return terms
+
+def _get_nlp():
+    """
+    Builds the spaCy pipeline once: the parser model if installed (for noun chunks),
+    otherwise a blank English tokenizer, plus an entity ruler over the gazetteer.
+    Returns None when spaCy cannot be imported.
+    """
+    global _nlp, _nlp_loaded
+    with _lock:
+        if not _nlp_loaded:
+            terms = gazetteer()
+            _canonical.update({keyword.lower(): keyword for keyword in terms})
+            _labels.update({keyword.lower(): label for keyword, label in terms.items()})
+            try:
+                import spacy
+                try:
+                    nlp = spacy.load(SPACY_MODEL, exclude=["ner", "lemmatizer", "textcat"])
+                except (OSError, ImportError):
+                    nlp = spacy.blank("en")
+                ruler = nlp.add_pipe("entity_ruler", config={"phrase_matcher_attr": "LOWER"})
+                ruler.add_patterns([{"label": label, "pattern": keyword} for keyword, label in terms.items()])
+                _nlp = nlp
+            except Exception as e:
+                print(f"spaCy unavailable, matching the gazetteer only: {e}")
+            _nlp_loaded = True
+    return _nlp
+
+def _extract_without_spacy(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Gazetteer matches and technology-looking tokens, for when spaCy is not installed.
+    """
+    found: Dict[str, Tuple[str, str]] = {}
+    covered = []
+    # Longest match first at each position; matches inside it ("SDK" in "Android SDK") are skipped
+    spans = get_matcher(sorted(_canonical.values())).find_all(text)
+    for key, start, end in sorted(spans, key=lambda span: (span[1], -span[2])):
+        if covered and end <= covered[-1][1]:
+            continue
+        covered.append((start, end))
+        found.setdefault(key, (_canonical[key], _labels[key]))
+    for match in _WORD.finditer(text):
+        token = match.group()
+        if any(start <= match.start() < end for start, end in covered):
+            continue
+        if _TECH_TOKEN.match(token) and not _CAMEL_CASE.match(token):
+            found.setdefault(token.lower(), (token, "HIGH"))
+    high = [keyword for keyword, label in found.values() if label == "HIGH"]
+    low = [keyword for keyword, label in found.values() if label == "LOW"]
+    return high, low
+
+def extract_keywords_local(job_description: str) -> Tuple[List[str], List[str]]:
+    """
+    Categorizes job description keywords without a network call, in the same
+    (high_priority, low_priority) form as local_match_utils.categorize_keywords.
+    Gazetteer matches keep their rating; other technology-looking tokens, capitalized words
+    listed alongside a known technology, and noun chunks containing technology tokens when
+    a parser is installed, are rated high.
+    """
+    nlp = _get_nlp()
+    text = clean_job_description(job_description, record=False)
+    if nlp is None:
+        return _extract_without_spacy(text)
+    doc = nlp(text)
+    found: Dict[str, Tuple[str, str]] = {}
+
+    def add(text: str, label: str) -> None:
+        text = text.strip(" .,;:()[]")
+        key = text.lower()
+        if len(key) > 1 and key not in found:
+            found[key] = (_canonical.get(key, text), label)
+
+    for ent in doc.ents:
+        add(ent.text, ent.label_)
+    if doc.has_annotation("DEP"):
+        for chunk in doc.noun_chunks:
+            tech = [t for t in chunk if _TECH_TOKEN.match(t.text)]
+            if tech and len(chunk) <= 3 and chunk.text.lower() not in found:
+                add(" ".join(t.text for t in chunk if not t.is_stop), "HIGH")
+    camel_counts: Dict[str, int] = {}
+    for token in doc:
+        if _CAMEL_CASE.match(token.text):
+            camel_counts[token.text] = camel_counts.get(token.text, 0) + 1
+    for token in doc:
+        if not _TECH_TOKEN.match(token.text) or token.ent_type_:
+            continue
+        if token.text in camel_counts:
+            # Pasted postings glue words together ("PythonDjango", "RemoteAbout"): keep the
+            # known parts, and unknown CamelCase only if it recurs like a product name would
+            parts = _GLUED_PARTS.findall(token.text)
+            known = [part for part in parts if part.lower() in _canonical]
+            if known and token.text.lower() not in _canonical:
+                for part in known:
+                    add(part, _label_of(part))
+                continue
+            if camel_counts[token.text] < 2 and token.text.lower() not in _canonical:
+                continue
+        add(token.text, "HIGH")
+    # Capitalized words listed next to a known technology are technologies too
+    # ("Kafka, Pulumi and Airflow"), e.g. ones missing from the gazetteer
+    for i, token in enumerate(doc):
+        if not token.is_alpha or not token.text[0].isupper() or token.is_stop or token.ent_type_:
+            continue
+        if token.is_sent_start or token.text.lower() in found:
+            continue
+        neighbours = [doc[j] for j in (i - 2, i + 2)
+                      if 0 <= j < len(doc) and doc[(i + j) // 2].text.lower() in _LIST_SEPARATORS]
+        if any(n.ent_type_ == "HIGH" or n.text.lower() in found for n in neighbours):
+            add(token.text, "HIGH")
+
+    high = [keyword for keyword, label in found.values() if label == "HIGH"]
+    low = [keyword for keyword, label in found.values() if label == "LOW"]
+    return high, low
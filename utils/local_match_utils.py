@@ -1,9 +1,23 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set, Tuple, Optional
+from dataclasses import dataclass
 import re
 import os
-import google.generativeai as genai
+import time
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .llm_cache import response_cache, make_cache_key
+from . import gemini_gateway, llm_backends, model_router
+from .llm_ledger import estimate_tokens
+from .rate_limiter import Priority
+from .json_repair import repair_json, JSONRepairError
+from .jd_cleaner import clean_job_description
+from .skill_table import keyword_key
+from .keyword_matcher import get_matcher
+from . import resume_index
+from .local_keywords import extract_keywords_local
 
-genai.configure(api_key=os.environ["GEMINI_API_KEY"])
 
 generation_config = {
     "temperature": 1,
@@ -12,10 +26,14 @@ generation_config = {
     "max_output_tokens": 8192,
 }
 
-model = genai.GenerativeModel(
-    model_name="gemini-1.5-flash-002",
-    generation_config=generation_config
-)
+MODEL_NAME = "gemini-1.5-flash-002"
+
+# "llm" asks Gemini (falling back to the offline extractor if that fails); "local" uses
+# only the offline spaCy extractor
+KEYWORD_EXTRACTOR = os.getenv("KEYWORD_EXTRACTOR", "llm")
+
+def _keyword_model():
+    return llm_backends.get_model(MODEL_NAME, generation_config)
 
 prompt = """
 Analyze the job description and classify each keyword as either high priority or low priority. High priority keywords, are those related to essential Technologies skills or experience directly mentioned in the job title or requirements, low priority keywords are those related to soft skills or general knowledge that are not directly mentioned.\nThe given examples of input are of job descriptions and the output are the response by ai model, which we want to achieve so try to get the response like these:\nDo not provide me input just give the high priority and low priority keywords\n\nAs we are doing it for Computer science engineeringjobs so make sure to put all the tech skills in high priority and soft skills and broader tech terms in low priority.
@@ -38,15 +56,197 @@ input: About the jobLocation: RemoteAbout UsAt WorkSaga, we help employees log t
 output: High Priority Keywords: MySQL, Django, GitHub, Python, SQL, FastAPI, Flask, full-stack, web services.\nLow Priority Keywords: problem-solving, communication skills, verbal communication, written and verbal communication skills.
 """
 
-def categorize_keywords(job_description: str) -> Tuple[List[str], List[str]]:
+# Shorter exemplars with the company boilerplate removed; same instructions and output format
+compact_prompt = """
+Classify the keywords of a Computer Science job description as high or low priority. High priority: concrete technologies, languages, tools and skills named in the title or requirements. Low priority: soft skills and broader tech terms. Reply only in the format of the example outputs.
+
+Examples:
+
+input: MERN Full Stack Developer (Backend Heavy). Build scalable backend services using Node.js, Express, Sequelize and PostgreSQL. Front-end with React, React Native, Next.js and Redux, React Query for state management. Real-time features with WebSockets. Containerize with Docker, deploy on AWS or Google Cloud with DevOps teams. Git and GitHub for version control. Microservices, serverless and CI/CD a plus. Problem-solving, attention to detail, communication. Preferred: MongoDB, Redis, Cassandra, GraphQL, TypeScript, TDD and automated testing, Agile with JIRA or Trello.
+output: High Priority Keywords: MongoDB, Agile, Git, React, Node.js, Redux, Cassandra, Docker, Google Cloud, GraphQL, Jira, Next.js, PostgreSQL, Redis, Serverless, Websockets, containerization, CI/CD, TypeScript.\nLow Priority Keywords: backend, database, microservices, front-end, automated testing, digital products, state management, full stack, TDD, version control, DevOps.
+
+input: Backend Engineer with strong Python. Skills Required: Python, Django/Flask, Docker containers, AWS services (EC2, RDS, S3), RESTful API development, SQL & NoSQL databases. Work with DevOps teams to manage cloud infrastructure. Familiarity with AWS or GCP. Strong database management skills. Excellent problem-solving abilities.
+output: High Priority Keywords: Django, Python, SQL, backend, API, Docker, Flask, GCP, NoSQL, database, cloud infrastructure, DevOps.\nLow Priority Keywords: problem-solving.
+
+input: Python full-stack engineer building Python web services and generative AI models. Strong Python with FastAPI, Flask or Django. SQL databases, ideally MySQL. Github profile preferred. Excellent problem-solving and analytical skills, strong written and verbal communication skills.
+output: High Priority Keywords: MySQL, Django, GitHub, Python, SQL, FastAPI, Flask, full-stack, web services.\nLow Priority Keywords: problem-solving, communication skills, verbal communication, written and verbal communication skills.
+"""
+
+# "full" sends the original few-shot prompt, "compact" the shorter one, "cached" keeps the
+# full prefix in a server-side context cache, and "auto" uses the cache when available
+# and falls back to the full prompt otherwise. The compact prompt drops most of each
+# example, so it is only used when asked for explicitly.
+PROMPT_MODE = os.getenv("KEYWORD_PROMPT_MODE", "full")
+
+# The API refuses to cache contexts smaller than this many tokens
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", 32768))
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CONTEXT_CACHE_TTL", 3600))
+# Wait before trying to create the cache again after a failed attempt
+CONTEXT_CACHE_RETRY_SECONDS = 300
+
+# "unavailable" is only set when caching can never work in this process (other backend,
+# SDK without caching, prefix below the minimum); failed requests set "retry_after"
+_cached_prefix = {"model": None, "expires": 0.0, "unavailable": False, "retry_after": 0.0,
+                  "creating": False}
+_cached_prefix_lock = threading.Lock()
+
+def _get_cached_prefix_model():
+    """
+    Returns a model bound to a server-side cache of the few-shot prefix, or None when
+    the installed SDK has no context caching, the prefix is below the API minimum, or the
+    cache is being created by another call. The lock is not held during API requests.
+    """
+    with _cached_prefix_lock:
+        if _cached_prefix["unavailable"]:
+            return None
+        now = time.time()
+        if _cached_prefix["model"] is not None and now < _cached_prefix["expires"]:
+            return _cached_prefix["model"]
+        if _cached_prefix["creating"] or now < _cached_prefix["retry_after"]:
+            return None
+
+        if llm_backends.get_backend().name != "gemini":
+            _cached_prefix["unavailable"] = True
+            return None
+        import google.generativeai as genai
+        caching = getattr(genai, "caching", None)
+        if caching is None or not hasattr(genai.GenerativeModel, "from_cached_content"):
+            _cached_prefix["unavailable"] = True
+            return None
+        _cached_prefix["creating"] = True
+
+    model = None
+    unavailable = False
+    try:
+        prefix_tokens = _keyword_model().count_tokens(prompt).total_tokens
+        if prefix_tokens < CONTEXT_CACHE_MIN_TOKENS:
+            unavailable = True
+        else:
+            cached_content = caching.CachedContent.create(
+                model=f"models/{MODEL_NAME}",
+                contents=[prompt],
+                ttl=f"{CONTEXT_CACHE_TTL_SECONDS}s",
+            )
+            model = genai.GenerativeModel.from_cached_content(
+                cached_content, generation_config=generation_config)
+    except Exception as e:
+        print(f"Context caching failed, retrying in {CONTEXT_CACHE_RETRY_SECONDS}s: {e}")
+
+    with _cached_prefix_lock:
+        _cached_prefix["creating"] = False
+        if unavailable:
+            _cached_prefix["unavailable"] = True
+        elif model is None:
+            _cached_prefix["retry_after"] = time.time() + CONTEXT_CACHE_RETRY_SECONDS
+        else:
+            _cached_prefix["model"] = model
+            # Refresh a little before the server drops the cache
+            _cached_prefix["expires"] = time.time() + CONTEXT_CACHE_TTL_SECONDS * 0.9
+    return model
+
+def _build_keyword_request(suffix: str) -> Tuple[object, str, str, str]:
+    """
+    Picks the prompt mode for a categorization call whose few-shot prefix is followed by `suffix`.
+    Returns (model, text_to_send, logical_prompt, mode); the logical prompt is what the
+    model effectively sees and is used for the response cache key.
+    """
+    if PROMPT_MODE in ("cached", "auto"):
+        cached_model = _get_cached_prefix_model()
+        if cached_model is not None:
+            return cached_model, suffix, prompt + suffix, "cached"
+    if PROMPT_MODE == "compact":
+        return _keyword_model(), compact_prompt + suffix, compact_prompt + suffix, "compact"
+    return _keyword_model(), prompt + suffix, prompt + suffix, "full"
+
+# Per-call token accounting for categorize_keywords, oldest calls dropped first
+token_accounting: deque = deque(maxlen=500)
+
+def _record_token_usage(mode: str, sent_text: str, response) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or estimate_tokens(sent_text)
+    cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+    if mode == "cached" and not cached_tokens:
+        cached_tokens = estimate_tokens(prompt)
+    output_tokens = getattr(usage, "candidates_token_count", 0) or estimate_tokens(response.text)
+
+    # Input tokens billed at full rate, and those avoided compared with resending the full prompt
+    billed_tokens = max(prompt_tokens - cached_tokens, 0)
+    if mode == "cached":
+        saved_tokens = cached_tokens
+    elif mode == "compact":
+        saved_tokens = estimate_tokens(prompt) - estimate_tokens(compact_prompt)
+    else:
+        saved_tokens = 0
+    token_accounting.append({
+        "time": time.time(),
+        "mode": mode,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "output_tokens": output_tokens,
+        "billed_input_tokens": billed_tokens,
+        "saved_input_tokens": saved_tokens,
+    })
+
+def get_token_savings() -> Dict[str, int]:
+    """
+    Summarizes token accounting across recorded categorize_keywords calls.
+    """
+    calls = list(token_accounting)
+    return {
+        "calls": len(calls),
+        "billed_input_tokens": sum(c["billed_input_tokens"] for c in calls),
+        "saved_input_tokens": sum(c["saved_input_tokens"] for c in calls),
+        "output_tokens": sum(c["output_tokens"] for c in calls),
+    }
+
+def categorize_keywords(job_description: str,
+                        priority: Priority = Priority.INTERACTIVE) -> Tuple[List[str], List[str]]:
     """
     Categorize keywords from a job description into high and low priority using Gemini AI.
+    `priority` is the rate limiter class; background and batch work should pass a lower one.
+    Company, benefits and application boilerplate is stripped before the description is sent.
+    With KEYWORD_EXTRACTOR=local the offline spaCy extractor answers instead.
     Returns a tuple of (high_priority_keywords, low_priority_keywords)
     """
-    response = model.generate_content(prompt + "\ninput: " + job_description)
-    response_text = response.text
+    if KEYWORD_EXTRACTOR == "local":
+        return extract_keywords_local(job_description)
+    job_description = clean_job_description(job_description)
+    if estimate_tokens(job_description) > CHUNK_THRESHOLD_TOKENS:
+        return _categorize_chunked(job_description, priority)
+    return _categorize_text(job_description, priority, "local_match_utils.categorize_keywords")
+
+def _categorize_text(text: str, priority: Priority, call_site: str) -> Tuple[List[str], List[str]]:
+    """
+    Categorizes one already cleaned description (or chunk of one), answering from the
+    response cache when the same text was seen before.
+    """
+    request_model, sent_text, logical_prompt, mode = _build_keyword_request("\ninput: " + text)
+    # Keyed on the logical request, not on the tier that answered: only replies that parse
+    # are cached, whichever tier gave them, and a per-tier key would miss whenever routing
+    # starts this call site on another tier
+    cache_key = make_cache_key(MODEL_NAME, generation_config, logical_prompt)
+    response_text = response_cache.get(cache_key)
+    if response_text is None:
+        # Flash answers first; the router escalates only if the reply cannot be parsed.
+        # Tiers other than the cached-content model get the whole prompt
+        response = model_router.generate(sent_text, call_site=call_site,
+                                         validate=lambda text: any(_parse_keyword_response(text)),
+                                         generation_config=generation_config, priority=priority,
+                                         model=request_model if mode == "cached" else None,
+                                         full_prompt=logical_prompt)
+        response_text = response.text
+        _record_token_usage(mode, sent_text, response)
+        # The router returns its last reply even when no tier gave a usable one; caching
+        # that would pin the description to the offline fallback until the entry expires
+        if any(_parse_keyword_response(response_text)):
+            response_cache.set(cache_key, response_text)
+
+    return _parse_keyword_response(response_text)
 
-    # Extract high and low priority keywords from the response
+def _parse_keyword_response(response_text: str) -> Tuple[List[str], List[str]]:
+    """
+    Extracts (high_priority, low_priority) from a "High Priority Keywords: ..." reply.
+    """
     try:
         high_priority = []
         low_priority = []
@@ -67,38 +267,297 @@ def categorize_keywords(job_description: str) -> Tuple[List[str], List[str]]:
         print(f"Error parsing Gemini response: {e}")
         return [], []
 
+# Cleaned descriptions longer than this are categorized in chunks of about CHUNK_TOKENS.
+# Every chunk is sent with the few-shot prefix (about 3,700 tokens), so chunks are kept
+# large enough for the prefix not to dominate, and there are at most MAX_CHUNKS of them
+CHUNK_THRESHOLD_TOKENS = int(os.getenv("KEYWORD_CHUNK_THRESHOLD", 6000))
+CHUNK_TOKENS = int(os.getenv("KEYWORD_CHUNK_TOKENS", 4000))
+MAX_CHUNKS = int(os.getenv("KEYWORD_MAX_CHUNKS", 3))
+
+_chunk_executor = ThreadPoolExecutor(max_workers=int(os.getenv("KEYWORD_CHUNK_WORKERS", 4)),
+                                     thread_name_prefix="keyword-chunks")
+
+def split_job_description(text: str, chunk_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """
+    Splits a description into chunks at line and sentence boundaries.
+    Boundaries are content-defined: a chunk ends after a sentence whose hash picks it once
+    the chunk holds half of `chunk_tokens` (or unconditionally at twice that), so an edit
+    only changes the chunks around it and the others keep their cache entries.
+    """
+    sentences = [s.strip() for s in re.split(r"\n+|(?<=[.!?])\s+", text) if s.strip()]
+    chunks, current, size = [], [], 0
+    for sentence in sentences:
+        current.append(sentence)
+        size += estimate_tokens(sentence)
+        boundary = hashlib.sha1(sentence.encode("utf-8")).digest()[0] % 4 == 0
+        if size >= 2 * chunk_tokens or (size >= chunk_tokens // 2 and boundary):
+            chunks.append("\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def merge_keyword_results(results: List[Tuple[List[str], List[str]]]) -> Tuple[List[str], List[str]]:
+    """
+    Merges per-chunk (high, low) lists in order, dropping duplicates that differ only in
+    case or punctuation. A keyword rated high in any chunk is high overall.
+    """
+    merged: Dict[str, List] = {}
+    for high_priority, low_priority in results:
+        for keyword, is_high in [(k, True) for k in high_priority] + [(k, False) for k in low_priority]:
+            key = keyword_key(keyword)
+            if not key:
+                continue
+            if key in merged:
+                merged[key][1] = merged[key][1] or is_high
+            else:
+                merged[key] = [keyword, is_high]
+    high = [keyword for keyword, is_high in merged.values() if is_high]
+    low = [keyword for keyword, is_high in merged.values() if not is_high]
+    return high, low
+
+def _categorize_chunked(job_description: str, priority: Priority) -> Tuple[List[str], List[str]]:
+    """
+    Categorizes the chunks of a long description concurrently (each cached on its own text)
+    and merges the results. A chunk that fails is skipped unless every chunk failed.
+    The chunk size doubles until there are at most MAX_CHUNKS, so boundaries stay
+    content-defined for descriptions of similar length.
+    """
+    chunk_tokens = CHUNK_TOKENS
+    chunks = split_job_description(job_description, chunk_tokens)
+    while len(chunks) > MAX_CHUNKS:
+        chunk_tokens *= 2
+        chunks = split_job_description(job_description, chunk_tokens)
+    futures = [_chunk_executor.submit(_categorize_text, chunk, priority,
+                                      "local_match_utils.categorize_keywords_chunk")
+               for chunk in chunks]
+    results, error = [], None
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            print(f"Keyword chunk failed: {e}")
+            error = e
+    if not results and error is not None:
+        raise error
+    return merge_keyword_results(results)
+
+# Job descriptions packed into one batched request; larger batches risk truncated output
+BATCH_SIZE = int(os.getenv("KEYWORD_BATCH_SIZE", 10))
+
+BATCH_INSTRUCTIONS = """
+Now classify the keywords of each job description below in the same way.
+Return ONLY a JSON array with one object per job description, using its id:
+[{"id": "<id>", "high": ["keyword", ...], "low": ["keyword", ...]}]
+"""
+
+def _format_keyword_response(high_priority: List[str], low_priority: List[str]) -> str:
+    return ("High Priority Keywords: " + ", ".join(high_priority) + ".\n"
+            "Low Priority Keywords: " + ", ".join(low_priority) + ".")
+
+def _single_cache_key(job_description: str) -> str:
+    logical_prompt = _build_keyword_request("\ninput: " + clean_job_description(job_description, record=False))[2]
+    return make_cache_key(MODEL_NAME, generation_config, logical_prompt)
+
+def _parse_batch_response(response_text: str, ids: List[str]) -> Dict[str, Tuple[List[str], List[str]]]:
+    """
+    Maps item ids to (high, low) lists for every well-formed entry of a batched reply.
+    """
+    parsed = {}
+    try:
+        items = repair_json(response_text, list)
+    except JSONRepairError:
+        return parsed
+    for item in items:
+        if not isinstance(item, dict) or item.get("id") not in ids:
+            continue
+        high, low = item.get("high"), item.get("low")
+        if isinstance(high, list) and isinstance(low, list):
+            parsed[item["id"]] = ([str(k).strip().rstrip(".") for k in high if str(k).strip()],
+                                  [str(k).strip().rstrip(".") for k in low if str(k).strip()])
+    return parsed
+
+def categorize_keywords_batch(job_descriptions: List[str],
+                              priority: Priority = Priority.BATCH) -> List[Tuple[List[str], List[str]]]:
+    """
+    Categorize many job descriptions with one structured request per BATCH_SIZE descriptions
+    instead of one request (and one copy of the few-shot prefix) each.
+    Cached descriptions are skipped, batches are sent concurrently, and only items the model
+    left out or returned malformed fall back to a single categorize_keywords call.
+    Returns one (high_priority_keywords, low_priority_keywords) tuple per input, in order.
+    """
+    results: Dict[str, Tuple[List[str], List[str]]] = {}
+    pending = []
+    for job_description in dict.fromkeys(job_descriptions):
+        if estimate_tokens(clean_job_description(job_description, record=False)) > CHUNK_THRESHOLD_TOKENS:
+            # Long descriptions are chunked and sent concurrently by categorize_keywords
+            results[job_description] = categorize_keywords(job_description, priority)
+            continue
+        cached = response_cache.get(_single_cache_key(job_description))
+        if cached is not None:
+            results[job_description] = _parse_keyword_response(cached)
+        else:
+            pending.append(job_description)
+
+    batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    requests = []
+    for batch in batches:
+        items = "".join(f"\nid: jd{n}\ninput: {clean_job_description(jd)}\n" for n, jd in enumerate(batch, 1))
+        request_model, sent_text, _, mode = _build_keyword_request(BATCH_INSTRUCTIONS + items)
+        requests.append((request_model, sent_text, mode))
+
+    responses = gemini_gateway.gather(
+        *[gemini_gateway.generate_async(request_model, sent_text, priority=priority,
+                                        call_site="local_match_utils.categorize_keywords_batch")
+          for request_model, sent_text, _ in requests],
+        return_exceptions=True,
+    )
+
+    for batch, (_, sent_text, mode), response in zip(batches, requests, responses):
+        if isinstance(response, Exception):
+            print(f"Batched categorization failed, retrying items one by one: {response}")
+            continue
+        _record_token_usage(mode, sent_text, response)
+        ids = [f"jd{n}" for n in range(1, len(batch) + 1)]
+        parsed = _parse_batch_response(response.text, ids)
+        for item_id, job_description in zip(ids, batch):
+            if item_id in parsed and any(parsed[item_id]):
+                high_priority, low_priority = parsed[item_id]
+                results[job_description] = (high_priority, low_priority)
+                # Later single lookups of the same description hit the cache
+                response_cache.set(_single_cache_key(job_description),
+                                   _format_keyword_response(high_priority, low_priority))
+
+    for job_description in pending:
+        if job_description not in results:
+            results[job_description] = categorize_keywords(job_description, priority)
+
+    return [results[job_description] for job_description in job_descriptions]
+
+def _found_keywords(keywords: List[str], resume_text: str) -> Set[str]:
+    """
+    Returns the lowercased keywords that occur in the resume: set lookups in the index of
+    a stored resume, otherwise one scan of the text.
+    """
+    index = resume_index.get_index(resume_text)
+    if index is not None:
+        return index.found(keywords)
+    return get_matcher(keywords).found(resume_text)
+
 def calculate_keyword_match_score(job_description: str, resume_text: str, keywords: List[str]) -> float:
     """
     Calculate the percentage of keywords from job description found in resume
     """
-    resume_text = resume_text.lower()
-    matched_keywords = 0
-    
-    for keyword in keywords:
-        if re.search(r'\b' + re.escape(keyword.lower()) + r'\b', resume_text):
-            matched_keywords += 1
-    
-    return round((matched_keywords / len(keywords)) * 100, 1) if keywords else 0
+    if not keywords:
+        return 0
+    found = _found_keywords(keywords, resume_text)
+    matched_keywords = sum(1 for keyword in keywords if keyword.lower().strip() in found)
+    return round((matched_keywords / len(keywords)) * 100, 1)
 
-def calculate_technical_skills_match_score(job_description: str, resume_text: str) -> float:
+def calculate_technical_skills_match_score(job_description: str, resume_text: str,
+                                          analysis: Optional["JobAnalysis"] = None) -> float:
     """
-    Calculate technical skills match score using only high priority keywords from Gemini
+    Calculate technical skills match score using only high priority keywords from Gemini.
+    Pass the JobAnalysis already computed for this job description to avoid another lookup.
     """
-    high_priority, _ = categorize_keywords(job_description)
-    
-    if not high_priority:
-        return 0.0
-        
-    return calculate_keyword_match_score(job_description, resume_text, high_priority)
+    if analysis is None:
+        analysis = analyze_job(job_description)
+    return analysis.technical_score(resume_text)
 
 def get_keyword_matches(keywords: List[str], resume_text: str) -> Dict[str, bool]:
     """
     Get a dictionary of keywords and whether they match in the resume
     """
-    matches = {}
-    resume_text = resume_text.lower()
-    
-    for keyword in keywords:
-        matches[keyword] = bool(re.search(r'\b' + re.escape(keyword.lower()) + r'\b', resume_text))
-    
-    return matches
+    found = _found_keywords(keywords, resume_text)
+    return {keyword: keyword.lower().strip() in found for keyword in keywords}
+
+
+@dataclass(frozen=True)
+class JobAnalysis:
+    """
+    Keyword analysis of a single job description, computed once and shared by
+    every page and scoring function.
+    """
+    job_description: str
+    high_priority: Tuple[str, ...]
+    low_priority: Tuple[str, ...]
+    # "llm", or "local" for the offline extractor's answer
+    source: str = "llm"
+
+    @property
+    def keywords(self) -> List[str]:
+        return list(self.high_priority) + list(self.low_priority)
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        return {"high": list(self.high_priority), "low": list(self.low_priority)}
+
+    def _found(self, resume_text: str) -> Set[str]:
+        # One lookup pass for high and low keywords together
+        return _found_keywords(self.keywords, resume_text)
+
+    def keyword_matches(self, resume_text: str) -> Tuple[Dict[str, bool], Dict[str, bool]]:
+        """
+        Returns (high_matches, low_matches) for the given resume text.
+        """
+        found = self._found(resume_text)
+        return ({k: k.lower().strip() in found for k in self.high_priority},
+                {k: k.lower().strip() in found for k in self.low_priority})
+
+    @staticmethod
+    def _score(keywords: Tuple[str, ...], found: Set[str]) -> float:
+        if not keywords:
+            return 0.0
+        return round(sum(1 for k in keywords if k.lower().strip() in found) / len(keywords) * 100, 1)
+
+    def technical_score(self, resume_text: str) -> float:
+        return self._score(self.high_priority, self._found(resume_text))
+
+    def overall_score(self, resume_text: str) -> float:
+        return self._score(tuple(self.keywords), self._found(resume_text))
+
+    def scores(self, resume_text: str) -> Dict[str, float]:
+        found = self._found(resume_text)
+        return {
+            "technical_score": self._score(self.high_priority, found),
+            "overall_score": self._score(tuple(self.keywords), found),
+        }
+
+_analysis_memo: Dict[str, JobAnalysis] = {}
+_analysis_lock = threading.Lock()
+_ANALYSIS_MEMO_SIZE = 128
+
+def analyze_job(job_description: str, priority: Priority = Priority.INTERACTIVE) -> JobAnalysis:
+    """
+    Returns the memoized JobAnalysis for a job description, calling Gemini only
+    the first time a description is seen in this process.
+    """
+    with _analysis_lock:
+        analysis = _analysis_memo.get(job_description)
+    if analysis is not None:
+        return analysis
+
+    try:
+        high_priority, low_priority = categorize_keywords(job_description, priority)
+    except Exception as e:
+        print(f"Keyword categorization failed, using the offline extractor: {e}")
+        high_priority, low_priority = [], []
+    if not high_priority and not low_priority:
+        return analyze_job_local(job_description)
+    source = "local" if KEYWORD_EXTRACTOR == "local" else "llm"
+    analysis = JobAnalysis(job_description, tuple(high_priority), tuple(low_priority), source)
+
+    # Offline fallbacks return above without being pinned, so the next call asks Gemini again
+    if analysis.keywords:
+        with _analysis_lock:
+            if len(_analysis_memo) >= _ANALYSIS_MEMO_SIZE:
+                _analysis_memo.pop(next(iter(_analysis_memo)))
+            _analysis_memo[job_description] = analysis
+    return analysis
+
+def analyze_job_local(job_description: str) -> JobAnalysis:
+    """
+    Returns an offline JobAnalysis in milliseconds, as a first answer to show while the
+    Gemini analysis runs or as the fallback when it fails.
+    """
+    high_priority, low_priority = extract_keywords_local(job_description)
+    return JobAnalysis(job_description, tuple(high_priority), tuple(low_priority), "local")
@@ -0,0 +1,152 @@
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from . import gemini_gateway, llm_backends
+from .json_repair import repair_json
+from .llm_ledger import call_ledger
+from .rate_limiter import Priority
+
+# Models from fastest/cheapest to largest; every task starts on the first adequate one
+MODEL_TIERS = [name.strip() for name in
+               os.getenv("GEMINI_MODEL_TIERS", "gemini-1.5-flash-002,gemini-1.5-pro-002").split(",")
+               if name.strip()]
+
+# Call sites pinned to a starting tier: "gemini_utils.get_resume_match_analysis=gemini-1.5-pro-002,..."
+CALL_SITE_ROUTES: Dict[str, str] = {
+    site.strip(): name.strip()
+    for site, _, name in (item.partition("=") for item in os.getenv("GEMINI_MODEL_ROUTES", "").split(","))
+    if site.strip() and name.strip()
+}
+
+# A call site whose recent calls needed escalation this often starts one tier up; calls
+# answered there count as not escalated, so the site drifts back down to re-probe the faster tier
+ESCALATION_WINDOW = 20
+ESCALATION_START_RATE = float(os.getenv("GEMINI_ESCALATION_START_RATE", 0.5))
+
+# A model is degraded when the median of its recent calls is this many times its usual median
+DEGRADED_FACTOR = float(os.getenv("GEMINI_DEGRADED_FACTOR", 2.0))
+RECENT_CALLS = 10
+MIN_LATENCY_SAMPLES = 30
+
+_lock = threading.Lock()
+_escalations: Dict[str, deque] = defaultdict(lambda: deque(maxlen=ESCALATION_WINDOW))
+_route_stats: Dict[str, int] = defaultdict(int)
+
+def _ledger_name(name: str) -> str:
+    # The SDK reports model names with a "models/" prefix
+    return name if name.startswith("models/") else f"models/{name}"
+
+def is_degraded(call_site: str, name: str) -> bool:
+    """
+    True when a model's recent latency at a call site is well above its usual latency
+    there. Each call site is its own baseline, so bulk calls (batches, chunks) with large
+    payloads do not make the model look slow for interactive ones.
+    """
+    ledger_name = _ledger_name(name)
+    if call_ledger.model_sample_count(call_site, ledger_name) < MIN_LATENCY_SAMPLES:
+        return False
+    usual = call_ledger.model_latency_percentile(call_site, ledger_name, 50)
+    recent = call_ledger.model_latency_percentile(call_site, ledger_name, 50, last=RECENT_CALLS)
+    return usual > 0 and recent > DEGRADED_FACTOR * usual
+
+def route(call_site: str) -> List[str]:
+    """
+    Returns the model names to try for a call site, in order: from its starting tier
+    (pinned, or raised when the site keeps needing escalation) upwards. A degraded first
+    choice swaps places with the next tier if that one is currently faster at this site.
+    """
+    start = 0
+    pinned = CALL_SITE_ROUTES.get(call_site)
+    if pinned in MODEL_TIERS:
+        start = MODEL_TIERS.index(pinned)
+    else:
+        with _lock:
+            history = list(_escalations[call_site])
+        if len(history) >= ESCALATION_WINDOW and sum(history) / len(history) >= ESCALATION_START_RATE:
+            start = min(start + 1, len(MODEL_TIERS) - 1)
+    names = MODEL_TIERS[start:]
+    if len(names) > 1 and is_degraded(call_site, names[0]) and not is_degraded(call_site, names[1]):
+        first = call_ledger.model_latency_percentile(call_site, _ledger_name(names[0]), 50, last=RECENT_CALLS)
+        second = call_ledger.model_latency_percentile(call_site, _ledger_name(names[1]), 50, last=RECENT_CALLS)
+        if 0 < second < first:
+            names = [names[1], names[0]] + names[2:]
+            _route_stats["rerouted"] += 1
+    return names
+
+def model_for(call_site: str, generation_config: Optional[dict] = None):
+    """
+    Returns the model a call site should use now, for calls that cannot be escalated
+    after the fact (e.g. streams already shown to the user).
+    """
+    return llm_backends.get_model(route(call_site)[0], generation_config)
+
+def json_validator(schema: Any) -> Callable[[str], bool]:
+    """
+    Returns a validator accepting responses that repair_json can read as `schema`.
+    """
+    def validate(text: str) -> bool:
+        repair_json(text, schema)
+        return True
+    return validate
+
+def generate(prompt, call_site: str, validate: Optional[Callable[[str], Any]] = None,
+             generation_config: Optional[dict] = None, priority: Priority = Priority.INTERACTIVE,
+             model=None, full_prompt=None, **kwargs) -> Any:
+    """
+    Sends a request on the first routed model and escalates to the next tier only when
+    the response fails `validate` (returns falsy or raises) or the call errors.
+    `model`, when given, is used instead of the first routed tier (e.g. a model bound to
+    cached content); `full_prompt` is then what the other tiers are sent, since they do
+    not have the cached prefix. Returns the first valid response, or the last one if none
+    validated; raises the last error if every tier failed.
+    """
+    names = route(call_site)
+    response, error = None, None
+    for tier, name in enumerate(names):
+        if tier == 0 and model is not None:
+            candidate, sent = model, prompt
+        else:
+            candidate = llm_backends.get_model(name, generation_config)
+            sent = prompt if full_prompt is None else full_prompt
+        try:
+            response = gemini_gateway.generate(candidate, sent, call_site=call_site, priority=priority, **kwargs)
+            error = None
+        except Exception as e:
+            error = e
+            if isinstance(e, gemini_gateway.DeadlineExceeded):
+                break
+            continue
+        try:
+            valid = validate is None or validate(response.text)
+        except Exception:
+            valid = False
+        if valid:
+            _record(call_site, escalated=tier > 0)
+            return response
+    _record(call_site, escalated=True)
+    if response is None and error is not None:
+        raise error
+    return response
+
+def _record(call_site: str, escalated: bool) -> None:
+    with _lock:
+        _escalations[call_site].append(1 if escalated else 0)
+        _route_stats["escalated" if escalated else "first_tier"] += 1
+
+def stream(prompt, call_site: str, generation_config: Optional[dict] = None,
+           priority: Priority = Priority.INTERACTIVE, **kwargs) -> Iterator[str]:
+    """
+    Streams a request from the call site's currently routed model.
+    """
+    return gemini_gateway.stream(model_for(call_site, generation_config), prompt,
+                                 call_site=call_site, priority=priority, **kwargs)
+
+def routing_stats() -> Dict[str, int]:
+    """
+    Returns how many calls were answered on the first tier, needed escalation, or were
+    rerouted away from a degraded model.
+    """
+    with _lock:
+        return dict(_route_stats)
@@ -0,0 +1,136 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Set
+
+from .local_match_utils import JobAnalysis, analyze_job
+from .rate_limiter import Priority
+
+# Quiet period after the last change to a job description before analysis starts. A
+# Streamlit text_area only reaches the script once its value is committed (on blur or
+# Ctrl+Enter), which already means the text stopped changing, so by default analysis
+# starts right away; set a delay for inputs that rerun on every keystroke
+DEBOUNCE_SECONDS = float(os.getenv("PREFETCH_DEBOUNCE", 0))
+
+# Prefetch entries kept for the Analyze button to pick up
+MAX_TRACKED = 64
+
+# Workers only ever run analyses; debouncing happens on timers, outside the pool
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+# Analyses the user is waiting for, kept apart so they never queue behind prefetches
+_interactive_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="analysis")
+_lock = threading.Lock()
+# session_id -> (job description, debounce timer or None) of the text it last typed
+_latest: Dict[str, tuple] = {}
+# job description -> prefetch future, shared by every session with the same text
+_prefetches: Dict[str, Future] = {}
+# job description -> sessions whose latest text it is
+_wanted: Dict[str, Set[str]] = {}
+
+def _release(session_id: str) -> None:
+    """
+    Forgets a session's previous text: its pending timer is stopped, and a queued prefetch
+    of that text is cancelled unless another session still wants it. Caller holds _lock.
+    """
+    previous = _latest.pop(session_id, None)
+    if previous is None:
+        return
+    job_description, timer = previous
+    if timer is not None:
+        timer.cancel()
+    sessions = _wanted.get(job_description)
+    if sessions is not None:
+        sessions.discard(session_id)
+        if not sessions:
+            del _wanted[job_description]
+            future = _prefetches.get(job_description)
+            if future is not None and future.cancel():
+                del _prefetches[job_description]
+
+def _start(session_id: str, job_description: str) -> None:
+    """
+    Submits the analysis if the session still has this text; run by the debounce timer.
+    """
+    with _lock:
+        latest = _latest.get(session_id)
+        if latest is None or latest[0] != job_description:
+            return
+        existing = _prefetches.get(job_description)
+        if existing is not None and _usable(existing):
+            return
+        _prefetches[job_description] = _executor.submit(analyze_job, job_description, Priority.BACKGROUND)
+        while len(_prefetches) > MAX_TRACKED:
+            oldest = next(iter(_prefetches))
+            _prefetches.pop(oldest).cancel()
+
+def schedule_job_analysis(session_id: str, job_description: str) -> None:
+    """
+    Starts analyzing a job description in the background, right away or once the session
+    has stopped changing it for DEBOUNCE_SECONDS. Earlier text from the same session is
+    dropped before it reaches Gemini, unless another session is waiting for the same text.
+    """
+    job_description = job_description.strip()
+    if not job_description:
+        return
+    with _lock:
+        latest = _latest.get(session_id)
+        if latest is not None and latest[0] == job_description:
+            return
+        _release(session_id)
+        timer = None
+        if DEBOUNCE_SECONDS > 0:
+            timer = threading.Timer(DEBOUNCE_SECONDS, _start, (session_id, job_description))
+            timer.daemon = True
+        _latest[session_id] = (job_description, timer)
+        _wanted.setdefault(job_description, set()).add(session_id)
+    if timer is not None:
+        timer.start()
+    else:
+        _start(session_id, job_description)
+
+def _usable(future: Future) -> bool:
+    """
+    False once a prefetch has been cancelled or has failed, so it can be scheduled again.
+    """
+    if not future.done():
+        return True
+    return not future.cancelled() and future.exception() is None and future.result() is not None
+
+def is_ready(job_description: str) -> bool:
+    """
+    True when a prefetch of this job description has finished with a result, so
+    get_job_analysis will return without calling Gemini.
+    """
+    with _lock:
+        future = _prefetches.get(job_description.strip())
+    return future is not None and future.done() and _usable(future)
+
+def get_job_analysis(job_description: str, session_id: Optional[str] = None) -> JobAnalysis:
+    """
+    Returns the JobAnalysis for a job description. A finished or running prefetch is
+    reused; one still debouncing or queued is cancelled and the analysis runs now at
+    interactive priority instead of waiting behind background work.
+    """
+    job_description = job_description.strip()
+    with _lock:
+        if session_id is not None:
+            _release(session_id)
+        future = _prefetches.get(job_description)
+        if future is not None and future.cancel():
+            del _prefetches[job_description]
+            future = None
+    if future is not None:
+        try:
+            analysis = future.result()
+            if analysis is not None:
+                return analysis
+        except Exception as e:
+            print(f"Prefetched analysis failed, analyzing again: {e}")
+    return analyze_job(job_description, Priority.INTERACTIVE)
+
+def submit_job_analysis(job_description: str, session_id: Optional[str] = None) -> Future:
+    """
+    Runs get_job_analysis in a worker thread, so the caller can show something else
+    while the request is in flight.
+    """
+    return _interactive_executor.submit(get_job_analysis, job_description, session_id)
@@ -0,0 +1,142 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from enum import IntEnum
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .llm_ledger import percentile
+
+# Per-minute quotas of the Gemini project; defaults are conservative for a paid tier
+REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_RPM", 60))
+TOKENS_PER_MINUTE = float(os.getenv("GEMINI_TPM", 1000000))
+
+class Priority(IntEnum):
+    """
+    Scheduling classes, served strictly in this order when quota is scarce.
+    """
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    BATCH = 2
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate_per_minute`, holding at most one minute of quota.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, cost: float, now: float) -> float:
+        """
+        Seconds until `cost` tokens are available (requests larger than the bucket wait for a full bucket).
+        """
+        self._refill(now)
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost: float) -> None:
+        self.tokens -= min(cost, self.capacity)
+
+    def drain(self) -> None:
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+class RateLimiter:
+    """
+    Process-wide limiter for Gemini requests with priority classes.
+
+    Callers await `acquire` on the gateway event loop. Waiters are served strictly by
+    priority and then in arrival order, as soon as both the request and the token bucket
+    allow it, so interactive work overtakes queued background and batch work and callers
+    wait for quota instead of failing.
+    """
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = TOKENS_PER_MINUTE):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._blocked_until = 0.0
+        self._wait_samples: Dict[Priority, deque] = {p: deque(maxlen=500) for p in Priority}
+        self._granted: Dict[Priority, int] = {p: 0 for p in Priority}
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE, tokens: int = 1) -> float:
+        """
+        Waits until one request costing `tokens` input tokens may be sent.
+        Returns the time spent queued, in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        enqueued = time.monotonic()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future, tokens))
+        self._dispatch()
+        # A cancelled waiter stays in the heap as a done future and is skipped by _dispatch
+        await future
+        waited = time.monotonic() - enqueued
+        self._wait_samples[Priority(priority)].append(waited)
+        self._granted[Priority(priority)] += 1
+        return waited
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            _, _, future, tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            delay = max(self._blocked_until - now,
+                        self._requests.time_until(1, now),
+                        self._tokens.time_until(tokens, now))
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            future.set_result(None)
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Holds every queued request for `seconds` after the API reported an exhausted quota.
+        Must be called on the gateway loop.
+        """
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._requests.drain()
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns queue depth and wait times (ms) per priority class.
+        """
+        waiting = [entry for entry in list(self._waiters) if not entry[2].done()]
+        stats = {}
+        for priority in Priority:
+            samples = list(self._wait_samples[priority])
+            stats[priority.name.lower()] = {
+                "queued": sum(1 for entry in waiting if entry[0] == priority),
+                "granted": self._granted[priority],
+                "wait_p50_ms": round(percentile(samples, 50) * 1000, 1),
+                "wait_p95_ms": round(percentile(samples, 95) * 1000, 1),
+            }
+        stats["blocked_for_s"] = round(max(0.0, self._blocked_until - time.monotonic()), 1)
+        return stats
+
+# Process-wide limiter used by the Gemini gateway
+rate_limiter = RateLimiter()
@@ -1,34 +1,20 @@
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
-import json
 import streamlit as st
 import subprocess
 import tempfile
+from . import model_router
+from .json_stream import StreamingJSONParser
+from .json_repair import repair_json, JSONRepairError
+from .jd_cleaner import clean_job_description
 
-# Load environment variables
-load_dotenv()
-api_key = os.getenv('GOOGLE_API_KEY')
-
-if not api_key:
-    st.error("""Google API Key not found! Please follow these steps:
-    1. Create a file named '.env' (not '.env.example') in your project directory
-    2. Add this line to the file: GOOGLE_API_KEY=your_actual_api_key_here
-    3. Get an API key from https://makersuite.google.com/app/apikey if you don't have one
-    """)
-else:
-    try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-    except Exception as e:
-        st.error(f"Error configuring Gemini AI: {str(e)}")
+# Shape of a generated project list after local JSON repair
+PROJECTS_SCHEMA = [{"name": str, "description": str}]
 
-def generate_projects(job_description: str, job_title: str, technical_skills: list) -> list:
-    """Generate relevant projects based on job description and skills"""
-    try:
-        prompt = f"""Generate 3 industrial-level projects that match this job description and title:
+
+def _projects_prompt(job_description: str, job_title: str, technical_skills: list) -> str:
+    return f"""Generate 3 industrial-level projects that match this job description and title:
         Job Title: {job_title}
-        Job Description: {job_description}
+        Job Description: {clean_job_description(job_description)}
         Technical Skills: {', '.join(technical_skills)}
 
         Rules for projects:
@@ -43,22 +29,59 @@ def generate_projects(job_description: str, job_title: str, technical_skills: li
 
         Return the projects in this exact JSON format:
         [
-            {
+            {{
                 "name": "Project Name",
                 "description": "Project Description",
                 "tech_stack": ["Tech1", "Tech2"]
-            }
+            }}
         ]"""
 
-        response = model.generate_content(prompt)
+def _show_project(project: dict) -> None:
+    with st.container():
+        st.markdown(f"**{project.get('name', '')}**")
+        st.write(project.get("description", ""))
+        if project.get("tech_stack"):
+            st.caption("Tech Stack: " + ", ".join(map(str, project["tech_stack"])))
+
+def generate_projects(job_description: str, job_title: str, technical_skills: list, stream: bool = False) -> list:
+    """Generate relevant projects based on job description and skills.
+    With stream=True each project is shown in the UI as soon as its JSON object is complete,
+    while the model is still writing the others."""
+    try:
+        prompt = _projects_prompt(job_description, job_title, technical_skills)
+        if stream:
+            # Projects are parsed as their objects close, so a truncated reply keeps them
+            parser = StreamingJSONParser(item_keys=(None,))
+            projects = []
+            for chunk in model_router.stream(prompt, call_site="resume_generator.generate_projects"):
+                for _, project in parser.feed(chunk):
+                    if isinstance(project, dict) and "name" in project and "description" in project:
+                        projects.append(project)
+                        _show_project(project)
+            if parser.result() is None:
+                # Truncated or relaxed JSON: recover what the streaming parser could not read
+                try:
+                    repaired = repair_json(parser.text, PROJECTS_SCHEMA)
+                    for project in repaired[len(projects):]:
+                        _show_project(project)
+                    projects = repaired
+                except JSONRepairError as e:
+                    if not projects:
+                        st.error(f"Failed to parse Gemini response as JSON: {str(e)}")
+                        st.text("Response received:")
+                        st.text(parser.text)
+            return projects
+
+        response_text = model_router.generate(prompt, call_site="resume_generator.generate_projects",
+                                              validate=model_router.json_validator(PROJECTS_SCHEMA)).text
         try:
-            # Extract JSON from response
-            projects = json.loads(response.text)
+            # Extract JSON from response, repairing fences, relaxed syntax and truncation locally
+            projects = repair_json(response_text, PROJECTS_SCHEMA)
             return projects
-        except json.JSONDecodeError as e:
+        except JSONRepairError as e:
             st.error(f"Failed to parse Gemini response as JSON: {str(e)}")
             st.text("Response received:")
-            st.text(response.text)
+            st.text(response_text)
             return []
     except Exception as e:
         st.error(f"Error generating projects: {str(e)}")
@@ -70,7 +93,7 @@ def generate_latex_resume(personal_info: dict, education: dict, job_description:
     try:
         # Generate projects using Gemini
         st.info("Generating projects with AI...")
-        projects = generate_projects(job_description, job_title, technical_skills)
+        projects = generate_projects(job_description, job_title, technical_skills, stream=True)
         
         if not projects:
             st.warning("No projects were generated. Using placeholder projects...")
@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Set
+
+from .keyword_matcher import WORD_RUN, is_word_char, get_matcher
+
+# Longest skill phrase, in words, answered from the index alone ("continuous integration
+# and deployment"); longer keywords are checked by scanning the resume text
+MAX_NGRAM = int(os.getenv("RESUME_INDEX_MAX_NGRAM", 4))
+
+# Symbol characters kept around an n-gram, for keywords like "C++", "C#" or ".NET"
+MAX_SYMBOLS = 3
+
+INDEX_VERSION = 1
+
+# Indexes of recently loaded or saved resumes, by text hash
+_MEMORY_SIZE = 32
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def index_path(resume_path: str) -> str:
+    """
+    Where the index of a resume JSON is stored: next to it, as <name>.index, so it is not
+    listed as a resume.
+    """
+    return os.path.splitext(resume_path)[0] + ".index"
+
+def _is_symbol(char: str) -> bool:
+    return not is_word_char(char) and not char.isspace()
+
+def _symbols(text: str, start: int, step: int) -> list:
+    """
+    The runs of symbol characters directly before (step -1) or after (step 1) a position,
+    shortest first, up to MAX_SYMBOLS characters.
+    """
+    found = []
+    for k in range(1, MAX_SYMBOLS + 1):
+        part = text[start - k:start] if step < 0 else text[start:start + k]
+        if len(part) < k or not _is_symbol(part[0 if step < 0 else -1]):
+            break
+        found.append(part)
+    return found
+
+class ResumeIndex:
+    """
+    Inverted index of one resume's text: every run of 1 to MAX_NGRAM consecutive words,
+    lowercased and with the text between the words kept as written, also with up to
+    MAX_SYMBOLS symbol characters that touch either end ("c++", ".net"). A keyword of that
+    shape occurs in the resume, with KeywordMatcher's whole-word rules, exactly when it is
+    one of these entries, so checking it is a set lookup; any other keyword is scanned for.
+    """
+
+    def __init__(self, text: str, ngrams: Set[str], digest: Optional[str] = None):
+        self.text = text
+        self.ngrams = ngrams
+        self.hash = digest or text_hash(text)
+
+    @classmethod
+    def build(cls, text: str) -> "ResumeIndex":
+        lowered = text.lower()
+        runs = [(m.start(), m.end()) for m in WORD_RUN.finditer(lowered)]
+        ngrams = set()
+        for i, (start, _) in enumerate(runs):
+            heads = _symbols(lowered, start, -1)
+            for _, end in runs[i:i + MAX_NGRAM]:
+                ngram = lowered[start:end]
+                tails = _symbols(lowered, end, 1)
+                ngrams.add(ngram)
+                ngrams.update(head + ngram for head in heads)
+                ngrams.update(ngram + tail for tail in tails)
+                ngrams.update(head + ngram + tail for head in heads for tail in tails)
+        return cls(text, ngrams)
+
+    def contains(self, keyword: str) -> bool:
+        key = keyword.lower().strip()
+        runs = list(WORD_RUN.finditer(key))
+        if not runs:
+            return key in self.text.lower() if key else False
+        head, tail = key[:runs[0].start()], key[runs[-1].end():]
+        if (len(runs) <= MAX_NGRAM and len(head) <= MAX_SYMBOLS and len(tail) <= MAX_SYMBOLS
+                and all(_is_symbol(c) for c in head + tail)):
+            return key in self.ngrams
+        # Longer phrases than the index holds, or edges with spaces ("Java (") that it
+        # does not record: scan the text
+        return bool(get_matcher([keyword]).found(self.text))
+
+    def found(self, keywords: Iterable[str]) -> Set[str]:
+        """
+        Returns the lowercased keywords that occur in the resume, like KeywordMatcher.found.
+        """
+        return {keyword.lower().strip() for keyword in keywords if self.contains(keyword)}
+
+    def to_json(self) -> dict:
+        return {"version": INDEX_VERSION, "hash": self.hash, "max_ngram": MAX_NGRAM,
+                "max_symbols": MAX_SYMBOLS, "ngrams": sorted(self.ngrams)}
+
+_lock = threading.Lock()
+_memory: "OrderedDict[str, ResumeIndex]" = OrderedDict()
+
+def _remember(index: ResumeIndex) -> ResumeIndex:
+    with _lock:
+        _memory[index.hash] = index
+        _memory.move_to_end(index.hash)
+        while len(_memory) > _MEMORY_SIZE:
+            _memory.popitem(last=False)
+    return index
+
+def save_index(resume_path: str, text: str) -> ResumeIndex:
+    """
+    Builds the index of a resume's text and writes it next to the resume JSON.
+    """
+    index = _remember(ResumeIndex.build(text))
+    path = index_path(resume_path)
+    try:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index.to_json(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Resume index write failed: {e}")
+    return index
+
+def load_index(resume_path: str, text: str) -> ResumeIndex:
+    """
+    Returns the stored index of a resume, rebuilding and rewriting it when it is missing
+    or was built from different text or settings.
+    """
+    digest = text_hash(text)
+    with _lock:
+        index = _memory.get(digest)
+    if index is not None:
+        return index
+    try:
+        with open(index_path(resume_path), encoding="utf-8") as f:
+            stored = json.load(f)
+        if (stored.get("version") == INDEX_VERSION and stored.get("hash") == digest
+                and stored.get("max_ngram") == MAX_NGRAM and stored.get("max_symbols") == MAX_SYMBOLS):
+            return _remember(ResumeIndex(text, set(stored["ngrams"]), digest))
+    except (OSError, ValueError, KeyError):
+        pass
+    return save_index(resume_path, text)
+
+def get_index(text: str) -> Optional[ResumeIndex]:
+    """
+    Returns the index of a stored resume with exactly this text, if one was loaded or
+    saved in this process; other text (e.g. a resume being edited) has none.
+    """
+    if not text:
+        return None
+    with _lock:
+        return _memory.get(text_hash(text))
@@ -1,27 +1,33 @@
 import os
 import json
 from typing import Dict, List
+from . import resume_index
 
 RESUME_DIR = "resumes"
 
 def load_resume(resume_path: str) -> Dict:
     """
-    Loads a resume from a JSON file.
+    Loads a resume from a JSON file, along with its keyword index.
     """
     try:
         with open(resume_path, 'r') as f:
-            return json.load(f)
+            resume_data = json.load(f)
     except FileNotFoundError:
         return {}
+    if resume_data.get("text"):
+        resume_index.load_index(resume_path, resume_data["text"])
+    return resume_data
 
 def save_resume(resume_data: Dict, resume_name: str) -> None:
     """
-    Saves a resume to a JSON file.
+    Saves a resume to a JSON file, with a keyword index of its text next to it.
     """
     os.makedirs(RESUME_DIR, exist_ok=True)
     resume_path = os.path.join(RESUME_DIR, f"{resume_name}.json")
     with open(resume_path, 'w') as f:
         json.dump(resume_data, f, indent=4)
+    if resume_data.get("text"):
+        resume_index.save_index(resume_path, resume_data["text"])
 
 def parse_resume(resume_text: str) -> Dict:
     """
@@ -53,7 +59,8 @@ def list_resumes() -> List[str]:
 
 def save_uploaded_resume(uploaded_file, resume_name: str, resume_text: str) -> str:
     """
-    Saves an uploaded resume PDF and its text content to the resumes directory.
+    Saves an uploaded resume PDF and its text content to the resumes directory,
+    with a keyword index of the text next to them.
     
     Args:
         uploaded_file: Streamlit's UploadedFile object
@@ -71,6 +78,7 @@ def save_uploaded_resume(uploaded_file, resume_name: str, resume_text: str) -> s
             "pdf_path": os.path.join(RESUME_DIR, f"{resume_name}.pdf"),
             "text": resume_text
         }, f, indent=4)
+    resume_index.save_index(resume_path, resume_text)
     
     pdf_path = os.path.join(RESUME_DIR, f"{resume_name}.pdf")
     with open(pdf_path, "wb") as f:
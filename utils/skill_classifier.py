@@ -1,12 +1,9 @@
-import google.generativeai as genai
-from typing import Tuple, List, Dict
-import os
-from dotenv import load_dotenv
-import json
-
-load_dotenv()
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-model = genai.GenerativeModel('gemini-pro')
+from typing import Tuple, List, Dict, Optional
+from . import model_router
+from .json_repair import repair_json
+from .jd_cleaner import clean_job_description
+from .rate_limiter import Priority
+from .skill_table import skill_table, keyword_key, UNKNOWN
 
 SKILL_PROMPT = """
 Given a job description, classify all mentioned skills into two categories and generate 3 industry-level projects.
@@ -25,26 +22,25 @@ Return your response in the following JSON format ONLY (no other text):
 
 Job Description: """
 
-def classify_skills_and_generate_projects(job_title: str, job_description: str) -> Dict:
+# Shape the reply must have after local JSON repair
+SKILLS_SCHEMA = {"technical_skills": list, "soft_skills": list, "projects": list}
+
+def classify_skills_and_generate_projects(job_title: str, job_description: str,
+                                          priority: Priority = Priority.INTERACTIVE) -> Dict:
     """
     Classify skills from job description and generate matching projects
     """
     try:
-        full_prompt = f"Job Title: {job_title}\n\n{SKILL_PROMPT}\n{job_description}"
-        response = model.generate_content(full_prompt)
+        full_prompt = f"Job Title: {job_title}\n\n{SKILL_PROMPT}\n{clean_job_description(job_description)}"
+        response = model_router.generate(full_prompt, priority=priority,
+                                         call_site="skill_classifier.classify_skills_and_generate_projects",
+                                         validate=model_router.json_validator(SKILLS_SCHEMA))
+        # Fences, relaxed syntax and truncation are repaired locally
+        result = repair_json(response.text, SKILLS_SCHEMA)
+        result["projects"] = [p for p in result["projects"] if isinstance(p, dict) and "description" in p]
         
-        # Parse the JSON response
-        try:
-            result = json.loads(response.text)
-        except json.JSONDecodeError:
-            # If JSON parsing fails, try to clean the response
-            cleaned_response = response.text.strip()
-            # Remove any markdown code block markers if present
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-            result = json.loads(cleaned_response.strip())
+        if not any(result.values()):
+            raise ValueError("No JSON object found in Gemini response")
         
         # Add mandatory technical skills
         result['technical_skills'].extend([
@@ -68,3 +64,86 @@ def classify_skills_and_generate_projects(job_title: str, job_description: str)
             "soft_skills": [],
             "projects": []
         }
+
+def _classify_with_gemini(keywords: List[str], priority: Priority) -> Dict[str, Tuple[str, str]]:
+    """
+    Ask Gemini to classify keywords; returns {skill: (category, priority)} as answered
+    """
+    prompt = f"""
+    Classify the following keywords into technical skills and soft skills. 
+    For each category, also indicate if they are high priority (essential/core skills) or low priority (nice-to-have skills).
+    Keywords: {', '.join(keywords)}
+    
+    Please format your response exactly as follows:
+    HIGH PRIORITY:
+    Technical Skills:
+    - [list technical skills]
+    Soft Skills:
+    - [list soft skills]
+    
+    LOW PRIORITY:
+    Technical Skills:
+    - [list technical skills]
+    Soft Skills:
+    - [list soft skills]
+    """
+    
+    response = model_router.generate(prompt, priority=priority, call_site="skill_classifier.classify_skills",
+                                     validate=lambda text: "PRIORITY:" in text and "\n-" in text)
+    text = response.text
+    
+    # Parse the response
+    answers = {}
+    current_section = None
+    current_category = None
+    
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+            
+        if "HIGH PRIORITY:" in line:
+            current_section = "high"
+        elif "LOW PRIORITY:" in line:
+            current_section = "low"
+        elif "Technical Skills:" in line:
+            current_category = "technical"
+        elif "Soft Skills:" in line:
+            current_category = "soft"
+        elif line.startswith('-') and current_section and current_category:
+            skill = line[1:].strip()
+            if skill:
+                answers[skill] = (current_category, current_section)
+    
+    return answers
+
+def lookup_skill_classifications(keywords: List[str],
+                                 priority: Priority = Priority.INTERACTIVE) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Return {keyword: (category, priority)} from the persistent skill table, asking Gemini
+    in one request only about keywords the table has not seen. Raises if that request fails.
+    """
+    known = skill_table.lookup(keywords)
+    missing = [k for k in dict.fromkeys(keywords) if k not in known]
+    if missing:
+        answers = _classify_with_gemini(missing, priority)
+        answers_by_key = {keyword_key(skill): answer for skill, answer in answers.items()}
+        learned = {k: answers_by_key.get(keyword_key(k), (UNKNOWN, None)) for k in missing}
+        skill_table.store(learned)
+        known.update(learned)
+    return known
+
+def group_skill_classifications(keywords: List[str], classifications: Dict[str, Tuple[str, Optional[str]]]
+                                ) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Arrange classified keywords into (high_priority, low_priority) dicts of technical and soft skills
+    """
+    high_priority = {"technical": [], "soft": []}
+    low_priority = {"technical": [], "soft": []}
+    for keyword in dict.fromkeys(keywords):
+        category, level = classifications.get(keyword, (UNKNOWN, None))
+        if category == UNKNOWN:
+            continue
+        target = high_priority if level == "high" else low_priority
+        target[category].append(keyword)
+    return high_priority, low_priority
@@ -0,0 +1,122 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_TABLE_PATH = os.getenv("SKILL_TABLE_PATH", os.path.join(".cache", "skill_table.sqlite3"))
+
+# Keywords the model left unclassified are asked about again after this long
+UNKNOWN_RETRY_SECONDS = 24 * 3600
+
+UNKNOWN = "unknown"
+
+def keyword_key(keyword: str) -> str:
+    """
+    Normalizes a keyword for lookups, so "Node.js", "NodeJS" and "nodejs " share an entry.
+    """
+    return re.sub(r"[^a-z0-9+#]", "", keyword.lower())
+
+class SkillTable:
+    """
+    Persistent keyword -> (category, priority) table filled from past Gemini answers.
+    Category is "technical" or "soft" ("unknown" when the model skipped the keyword);
+    priority is "high" or "low".
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLE_PATH):
+        self.path = path
+        self._schema_ready = False
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[str, str, float]] = {}
+
+    @contextmanager
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS skills ("
+                "key TEXT PRIMARY KEY, keyword TEXT NOT NULL, category TEXT NOT NULL, "
+                "priority TEXT, updated REAL NOT NULL)"
+            )
+            conn.commit()
+            self._schema_ready = True
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, keywords: Iterable[str]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """
+        Returns {keyword: (category, priority)} for every keyword already in the table.
+        Unknown entries past their retry time are left out so they get classified again.
+        """
+        keys = {keyword: keyword_key(keyword) for keyword in keywords if keyword_key(keyword)}
+        with self._lock:
+            rows = {key: self._memory[key] for key in keys.values() if key in self._memory}
+        missing = [key for key in set(keys.values()) if key not in rows]
+        if missing:
+            try:
+                with self._connect() as conn:
+                    placeholders = ",".join("?" * len(missing))
+                    for key, category, priority, updated in conn.execute(
+                            f"SELECT key, category, priority, updated FROM skills WHERE key IN ({placeholders})",
+                            missing):
+                        rows[key] = (category, priority, updated)
+                with self._lock:
+                    self._memory.update({key: row for key, row in rows.items()})
+            except sqlite3.Error as e:
+                print(f"Skill table read failed: {e}")
+
+        now = time.time()
+        found = {}
+        for keyword, key in keys.items():
+            row = rows.get(key)
+            if row is None:
+                continue
+            if row[0] == UNKNOWN and now - row[2] > UNKNOWN_RETRY_SECONDS:
+                continue
+            found[keyword] = (row[0], row[1])
+        return found
+
+    def entries(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        """
+        Returns every stored {keyword: (category, priority)}.
+        """
+        try:
+            with self._connect() as conn:
+                return {keyword: (category, priority) for keyword, category, priority in
+                        conn.execute("SELECT keyword, category, priority FROM skills")}
+        except sqlite3.Error as e:
+            print(f"Skill table read failed: {e}")
+            return {}
+
+    def store(self, entries: Dict[str, Tuple[str, Optional[str]]]) -> None:
+        """
+        Saves {keyword: (category, priority)} answers, replacing older ones.
+        """
+        now = time.time()
+        rows = [(keyword_key(k), k, category, priority, now)
+                for k, (category, priority) in entries.items() if keyword_key(k)]
+        if not rows:
+            return
+        with self._lock:
+            self._memory.update({row[0]: (row[2], row[3], now) for row in rows})
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO skills (key, keyword, category, priority, updated) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            print(f"Skill table write failed: {e}")
+
+# Process-wide table shared by every session
+skill_table = SkillTable()
@@ -1,5 +1,5 @@
 import streamlit as st
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional
 
 def display_keywords(keywords: List[str]) -> None:
     """
@@ -40,3 +40,18 @@ def get_side_by_side_layout(left_content, right_content):
         st.write(left_content)
     with col2:
         st.write(right_content)
+
+def display_stream(chunks: Iterable[str], placeholder=None, language: Optional[str] = None) -> str:
+    """
+    Renders text chunks into a placeholder as they arrive and returns the full text.
+    Pass `language` to show the text as a code block (e.g. "json").
+    """
+    placeholder = placeholder or st.empty()
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        if language:
+            placeholder.code(text, language=language)
+        else:
+            placeholder.markdown(text)
+    return text